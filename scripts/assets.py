@@ -0,0 +1,180 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pygame import *
+from scripts.common import *
+
+ASSETS_DIR = 'assets'
+CACHE_PATH = os.path.join('.cache', 'assets.pickle')
+CACHE_VERSION = 1
+
+class Assets:
+    '''
+    The process-wide asset registry.
+
+    Every image is decoded and scaled once and the same Surface is handed out to every caller.
+
+    Attributes:
+    - surfaces (dict): The scaled surfaces keyed by path, size and horizontal flip.
+
+    Methods:
+    - targets(): Get the path and the size of every image under the assets directory.
+    - get(image_path, size, flip): Get a shared scaled surface.
+    - preload(workers, cache_path): Decode and scale every image once.
+    - load(image_path, size): Decode and scale an image.
+    - read_cache(cache_path, sources): Read the scaled surfaces from the disk cache.
+    - write_cache(cache_path, sources): Write the scaled surfaces to the disk cache.
+    '''
+    surfaces = {}
+
+    @staticmethod
+    def targets():
+        '''
+        Get the path and the size of every image under the assets directory.
+
+        Returns:
+            list: The pairs of image path and size.
+        '''
+        # Map the full screen images to their own sizes
+        sizes = {
+            ImagePath.COVER: Size.BOARD,
+            ImagePath.START_BTN: Size.START_BTN,
+            ImagePath.GUIDE: Size.SUBSCREEN,
+            ImagePath.CARD: Size.SUBSCREEN,
+        }
+
+        # Initialize the result
+        result = []
+
+        # Walk the assets directory, the artworks use the artwork size and everything else the cell size
+        for root, _, files in os.walk(ASSETS_DIR):
+            for file in sorted(files):
+                if file.endswith('.png'):
+                    image_path = os.path.join(root, file).replace(os.sep, '/')
+                    result.append((image_path, sizes.get(image_path, Size.ARTWORK if '/artworks/' in image_path else Size.CELL)))
+
+        # Return the result
+        return result
+
+    @staticmethod
+    def get(image_path, size, flip=False):
+        '''
+        Get a shared scaled surface, loading it on first use.
+
+        Args:
+            image_path (str): The image path.
+            size (tuple): The size of the image.
+            flip (bool): True to get the horizontally flipped image, False otherwise.
+
+        Returns:
+            Surface: The scaled surface.
+        '''
+        # Load the image on first use
+        key = (image_path, size, flip)
+        if key not in Assets.surfaces:
+            Assets.surfaces[key] = transform.flip(Assets.get(image_path, size), True, False) if flip else Assets.load(image_path, size)
+
+        # Return the shared surface
+        return Assets.surfaces[key]
+
+    @staticmethod
+    def preload(workers=None, cache_path=CACHE_PATH):
+        '''
+        Decode and scale every image once, from the disk cache when it is up to date.
+
+        Args:
+            workers (int): The number of decoding threads, None for the default, 1 to decode serially.
+            cache_path (str): The disk cache path, None to skip the disk cache.
+        '''
+        # Get the images, their sizes and their modification times
+        targets = Assets.targets()
+        sources = {(image_path, size): os.path.getmtime(image_path) for image_path, size in targets}
+
+        # Read the disk cache
+        if cache_path and Assets.read_cache(cache_path, sources):
+            return
+
+        # Decode and scale the missing images
+        missing = [(image_path, size) for image_path, size in targets if (image_path, size, False) not in Assets.surfaces]
+        if workers == 1:
+            surfaces = [Assets.load(image_path, size) for image_path, size in missing]
+        else:
+            with ThreadPoolExecutor(workers) as executor:
+                surfaces = list(executor.map(lambda target: Assets.load(*target), missing))
+
+        # Register the surfaces
+        for (image_path, size), surface in zip(missing, surfaces):
+            Assets.surfaces[(image_path, size, False)] = surface
+
+        # Write the disk cache
+        if cache_path:
+            Assets.write_cache(cache_path, sources)
+
+    @staticmethod
+    def load(image_path, size):
+        '''
+        Decode and scale an image.
+
+        Args:
+            image_path (str): The image path.
+            size (tuple): The size of the image.
+
+        Returns:
+            Surface: The scaled surface.
+        '''
+        return transform.scale(image.load(image_path), size)
+
+    @staticmethod
+    def read_cache(cache_path, sources):
+        '''
+        Read the scaled surfaces from the disk cache.
+
+        Args:
+            cache_path (str): The disk cache path.
+            sources (dict): The modification time of each image, keyed by path and size.
+
+        Returns:
+            bool: True if the cache was up to date and read, False otherwise.
+        '''
+        # Read the cache file
+        try:
+            with open(cache_path, 'rb') as file:
+                cache = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+
+        # Check that the cache matches the images
+        if cache.get('version') != CACHE_VERSION or cache.get('sources') != sources:
+            return False
+
+        # Rebuild the surfaces from their raw pixels
+        for image_path, size in sources:
+            Assets.surfaces[(image_path, size, False)] = image.frombytes(cache['surfaces'][(image_path, size)], size, 'RGBA')
+
+        # Return True to indicate that the cache was read
+        return True
+
+    @staticmethod
+    def write_cache(cache_path, sources):
+        '''
+        Write the scaled surfaces to the disk cache.
+
+        Args:
+            cache_path (str): The disk cache path.
+            sources (dict): The modification time of each image, keyed by path and size.
+        '''
+        # Collect the raw pixels of the surfaces
+        cache = {
+            'version': CACHE_VERSION,
+            'sources': sources,
+            'surfaces': {(image_path, size): image.tobytes(Assets.surfaces[(image_path, size, False)], 'RGBA') for image_path, size in sources},
+        }
+
+        # Write the cache file atomically
+        try:
+            os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+            with open(f'{cache_path}.tmp', 'wb') as file:
+                pickle.dump(cache, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(f'{cache_path}.tmp', cache_path)
+        except OSError:
+            pass
@@ -0,0 +1,297 @@
+import argparse
+import glob
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import scripts.bitboard as bitboard
+from scripts.board import *
+from scripts.bot import *
+from scripts.log import *
+from scripts.records import *
+
+# The tree searches, each with the search taking a counting bitboard, the side to move, the depth and the result of the setup,
+# and the setup of a fresh search context
+SEARCHES = {
+    'minimax': (lambda board, side, depth, _: Bot.minimax(board, side, depth, True)[1], lambda: None),
+    'alpha_beta': (lambda board, side, depth, context: Bot.minimax_alpha_beta_pruning(board, side, depth, float('-inf'), float('inf'), True, context)[1], SearchContext),
+    'iterative_deepening': (lambda board, side, depth, context: Bot.iterative_deepening(board, side, depth, context)[1], SearchContext),
+}
+
+# The path searches, each taking a board, a piece and the end positions of the piece
+PATH_SEARCHES = {
+    'breadth_first_search': Bot.breadth_first_search,
+    'a_star_search': Bot.a_star_search,
+}
+
+class CountingBitboard(bitboard.Bitboard):
+    '''
+    A bitboard that counts the moves made on it, one node per move.
+
+    Attributes:
+    - nodes (int): The number of moves made.
+
+    Methods:
+    - make_move(self, move): Count the node and make the move.
+    '''
+    nodes = 0
+
+    def make_move(self, move):
+        '''
+        Count the node and make the move.
+
+        Args:
+            move (tuple): The move.
+        '''
+        self.nodes += 1
+        super().make_move(move)
+
+class Benchmark:
+    '''
+    The search benchmark over a fixed, seeded suite of midgame positions.
+
+    Every position is a game replayed from the start, so the suite only depends on the seed and the logs.
+    Nodes are the moves made during a search, the path searches report the searches instead.
+
+    Methods:
+    - sample_positions(paths, count, seed, min_ply, max_ply, max_games): Sample the positions of the suite.
+    - replay(moves): Replay moves from the start.
+    - measure(function, setup, memory): Time a function and measure its peak memory.
+    - run_search(name, positions, depth, memory): Benchmark a tree search at a depth.
+    - run_path_search(name, positions, memory): Benchmark a path search.
+    - run(positions, depths, algorithms, memory): Benchmark the algorithms on the suite.
+    - revision(): Get the revision of the repository.
+    '''
+
+    @staticmethod
+    def sample_positions(paths, count=8, seed=0, min_ply=10, max_ply=40, max_games=1_000):
+        '''
+        Sample the positions of the suite from the logged games, or from seeded random games if there are no logs.
+
+        Args:
+            paths (list): The CSV paths of the logs.
+            count (int): The number of positions.
+            seed (int): The seed of the sampling.
+            min_ply (int): The minimum number of moves played before a position.
+            max_ply (int): The maximum number of moves played before a position.
+            max_games (int): The number of logged games to sample from.
+
+        Returns:
+            list: The moves leading to each position, as in the logs.
+        '''
+        # Read the first logged games, the logs may be missing or not checked out
+        rng = random.Random(seed)
+        games = []
+        try:
+            for _, _, moves, _ in GameRecords.read_csv(paths):
+                if len(moves) > min_ply:
+                    games.append([bitboard.MOVES[packed] for packed in moves])
+                if len(games) >= max_games:
+                    break
+        except (KeyError, ValueError, OSError):
+            games = []
+
+        # Cut the sampled games at a random ply, stopping before the end of the game
+        positions = []
+        for moves in rng.sample(games, min(count, len(games))):
+            positions.append(moves[:rng.randint(min_ply, min(max_ply, len(moves) - 1))])
+
+        # Fill the suite with random games that are still running
+        while len(positions) < count:
+            board = Board(is_copy=True).bitboard
+            side = PlayerSide.LIGHT
+            moves = []
+            for _ in range(rng.randint(min_ply, max_ply)):
+                if not (valid_moves := board.get_valid_moves(side)):
+                    break
+                moves.append(rng.choice(valid_moves))
+                board.make_move(moves[-1])
+                side = PlayerSide.opponent_of(side)
+                if board.is_game_over:
+                    break
+            if not board.is_game_over and len(moves) >= min_ply:
+                positions.append(moves)
+
+        # Return the moves as in the logs
+        return [' '.join(Log.move_to_enum(move) for move in moves) for moves in positions]
+
+    @staticmethod
+    def replay(moves):
+        '''
+        Replay moves from the start.
+
+        Args:
+            moves (str): The moves as in the logs, separated by spaces.
+
+        Returns:
+            tuple: The board and the side to move.
+        '''
+        board = Board(is_copy=True)
+        for move in moves.split():
+            board.make_move(Log.enum_to_move(move))
+        return board, PlayerSide.LIGHT if len(board.move_history) % 2 == 0 else PlayerSide.DARK
+
+    @staticmethod
+    def measure(function, setup=lambda: None, memory=True):
+        '''
+        Time a function and measure its peak memory in a second run, since tracing slows it down.
+
+        Args:
+            function (function): The function taking the result of the setup.
+            setup (function): The setup without arguments, neither timed nor counted in the peak memory.
+            memory (bool): True to measure the peak memory, False otherwise.
+
+        Returns:
+            tuple: The elapsed time in seconds, the peak memory in bytes, None if it is not measured, and the result.
+        '''
+        # Time the function
+        argument = setup()
+        start = time.perf_counter()
+        result = function(argument)
+        elapsed = time.perf_counter() - start
+
+        # Trace the allocations of a second run, its setup such as the transposition table allocated before the trace
+        peak = None
+        if memory:
+            argument = setup()
+            tracemalloc.start()
+            function(argument)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        # Return the measures
+        return elapsed, peak, result
+
+    @staticmethod
+    def run_search(name, positions, depth, memory=True):
+        '''
+        Benchmark a tree search at a depth.
+
+        Args:
+            name (str): The name of the search.
+            positions (list): The moves leading to each position.
+            depth (int): The depth.
+            memory (bool): True to measure the peak memory, False otherwise.
+
+        Returns:
+            dict: The nodes, the time to depth, the nodes per second and the peak memory over the suite.
+        '''
+        # Initialize the totals
+        nodes, elapsed, peak = 0, 0.0, None
+
+        # Search each position on a fresh counting bitboard
+        for moves in positions:
+            board, side = Benchmark.replay(moves)
+            counting = board.bitboard.copy()
+            counting.__class__ = CountingBitboard
+            search, setup = SEARCHES[name]
+            position_elapsed, position_peak, _ = Benchmark.measure(lambda context: search(counting, side, depth, context), setup, memory)
+
+            # Count the nodes of the timed run only, the traced run makes the same moves
+            nodes += counting.nodes // (2 if memory else 1)
+            elapsed += position_elapsed
+            peak = position_peak if peak is None else max(peak, position_peak)
+
+        # Return the totals
+        return {'algorithm': name, 'depth': depth, 'positions': len(positions), 'nodes': nodes, 'seconds': round(elapsed, 6), 'nodes_per_second': round(nodes / max(elapsed, 1e-9)), 'peak_memory': peak}
+
+    @staticmethod
+    def run_path_search(name, positions, memory=True):
+        '''
+        Benchmark a path search from every piece of the side to move, as the computer does.
+
+        Args:
+            name (str): The name of the search.
+            positions (list): The moves leading to each position.
+            memory (bool): True to measure the peak memory, False otherwise.
+
+        Returns:
+            dict: The searches, the time, the searches per second and the peak memory over the suite.
+        '''
+        # Initialize the totals
+        searches, elapsed, peak = 0, 0.0, None
+
+        # Search from each piece of each position
+        for moves in positions:
+            board, side = Benchmark.replay(moves)
+            pieces = list(board.pieces_of[side])
+            position_elapsed, position_peak, _ = Benchmark.measure(lambda _: [PATH_SEARCHES[name](board, piece, piece.position, piece.weaker_pieces_positions(board)) for piece in pieces], memory=memory)
+            searches += len(pieces)
+            elapsed += position_elapsed
+            peak = position_peak if peak is None else max(peak, position_peak)
+
+        # Return the totals
+        return {'algorithm': name, 'depth': None, 'positions': len(positions), 'searches': searches, 'seconds': round(elapsed, 6), 'searches_per_second': round(searches / max(elapsed, 1e-9)), 'peak_memory': peak}
+
+    @staticmethod
+    def run(positions, depths=(1, 2, 3), algorithms=None, memory=True):
+        '''
+        Benchmark the algorithms on the suite and print a summary line for each run.
+
+        Args:
+            positions (list): The moves leading to each position.
+            depths (list): The depths of the tree searches.
+            algorithms (list): The names of the algorithms, None for every algorithm.
+            memory (bool): True to measure the peak memory, False otherwise.
+
+        Returns:
+            list: The result of each algorithm at each depth.
+        '''
+        # Initialize the results
+        results = []
+
+        # Run each algorithm
+        for name in algorithms or [*SEARCHES, *PATH_SEARCHES]:
+            for depth in depths if name in SEARCHES else [None]:
+                result = Benchmark.run_search(name, positions, depth, memory) if name in SEARCHES else Benchmark.run_path_search(name, positions, memory)
+                results.append(result)
+                print(f'{name:<22} depth {depth or "-":>2}  {result.get("nodes", result.get("searches")):>10} {"nodes" if name in SEARCHES else "paths"}  {result["seconds"]:9.3f}s  {result.get("nodes_per_second", result.get("searches_per_second")):>10,}/s  peak {result["peak_memory"] or 0:>12,} B', file=sys.stderr)
+
+        # Return the results
+        return results
+
+    @staticmethod
+    def revision():
+        '''
+        Get the revision of the repository.
+
+        Returns:
+            str: The commit hash, None if it is unknown.
+        '''
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Benchmark the search algorithms on a fixed, seeded suite of midgame positions.')
+    parser.add_argument('paths', nargs='*', default=sorted(glob.glob('dark_*.csv')), help='the CSV logs to sample from, dark_*.csv by default')
+    parser.add_argument('-n', '--positions', type=int, default=8, help='the number of positions')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='the seed of the sampling')
+    parser.add_argument('-d', '--depths', type=int, nargs='+', default=[1, 2, 3], help='the depths of the tree searches')
+    parser.add_argument('-a', '--algorithms', nargs='+', help=f'the algorithms among {", ".join([*SEARCHES, *PATH_SEARCHES])}, every algorithm by default')
+    parser.add_argument('-o', '--output', help='the JSON path of the results, the standard output by default')
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory measurement')
+    args = parser.parse_args()
+
+    # Benchmark the suite
+    positions = Benchmark.sample_positions(args.paths, args.positions, args.seed)
+    report = {
+        'revision': Benchmark.revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'positions': positions,
+        'results': Benchmark.run(positions, args.depths, args.algorithms, not args.no_memory),
+    }
+
+    # Write the results
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
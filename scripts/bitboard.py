@@ -0,0 +1,665 @@
+import random
+import scripts.common as common
+import scripts.pieces.rat as rat
+import scripts.pieces.cat as cat
+import scripts.pieces.dog as dog
+import scripts.pieces.wolf as wolf
+import scripts.pieces.leopard as leopard
+import scripts.pieces.tiger as tiger
+import scripts.pieces.lion as lion
+import scripts.pieces.elephant as elephant
+from scripts.common import *
+from scripts.geometry import *
+
+# Squares
+SQUARES = common.W * common.H
+SQUARE_OF = {position: square for square, position in enumerate(POSITIONS)}
+BITS = tuple(1 << square for square in range(SQUARES))
+
+# Sides, indexed by the side index used in the masks
+SIDES = (PlayerSide.DARK, PlayerSide.LIGHT)
+SIDE_INDEX = {PlayerSide.DARK: 0, PlayerSide.LIGHT: 1}
+
+# Piece kinds, a piece code is its kind for the dark side and kind + 8 for the light side
+KINDS = (PieceAtk.RAT, PieceAtk.CAT, PieceAtk.DOG, PieceAtk.WOLF, PieceAtk.LEOPARD, PieceAtk.TIGER, PieceAtk.LION, PieceAtk.ELEPHANT)
+KIND_OF_PIECE = {
+    rat.Rat: PieceAtk.RAT,
+    cat.Cat: PieceAtk.CAT,
+    dog.Dog: PieceAtk.DOG,
+    wolf.Wolf: PieceAtk.WOLF,
+    leopard.Leopard: PieceAtk.LEOPARD,
+    tiger.Tiger: PieceAtk.TIGER,
+    lion.Lion: PieceAtk.LION,
+    elephant.Elephant: PieceAtk.ELEPHANT,
+}
+CODES = 17
+KIND_OF_CODE = (0,) + KINDS + KINDS
+SIDE_OF_CODE = (0,) + (0,) * 8 + (1,) * 8
+
+# Square masks
+RIVER = sum(BITS[SQUARE_OF[position]] for position in RIVERS)
+DARK_TRAPS = sum(BITS[SQUARE_OF[position]] for position in (CellPosition.DARK_TRAP_1, CellPosition.DARK_TRAP_2, CellPosition.DARK_TRAP_3))
+LIGHT_TRAPS = sum(BITS[SQUARE_OF[position]] for position in (CellPosition.LIGHT_TRAP_1, CellPosition.LIGHT_TRAP_2, CellPosition.LIGHT_TRAP_3))
+OPPONENT_TRAPS = (LIGHT_TRAPS, DARK_TRAPS)
+OPPONENT_DENS = (BITS[SQUARE_OF[CellPosition.LIGHT_DEN]], BITS[SQUARE_OF[CellPosition.DARK_DEN]])
+
+# The terminal status of a position that has not been checked yet
+UNKNOWN = 'Unknown'
+
+# Move codes are (source << 6) | target, the undo stack also keeps the captured code above bit 12
+MOVE_MASK = 0xFFF
+MOVES = [None] * (64 * 64)
+for _source in range(SQUARES):
+    for _target in range(SQUARES):
+        MOVES[_source << 6 | _target] = (POSITIONS[_source], POSITIONS[_target])
+
+def _steps(kind, square):
+    '''
+    Build the destinations of a piece kind from a square on an empty board.
+
+    Args:
+        kind (int): The piece kind.
+        square (int): The square.
+
+    Returns:
+        tuple: Pairs of the target square and the mask of river squares that must be empty.
+    '''
+    # Initialize the result
+    result = []
+    position = POSITIONS[square]
+
+    # Iterate through the neighbours
+    for direction, neighbour in enumerate(NEIGHBOURS[position]):
+        # Step onto land, or into the river for the rat and the dog
+        if not neighbour:
+            continue
+        elif neighbour not in RIVERS or kind in (PieceAtk.RAT, PieceAtk.DOG):
+            result.append((SQUARE_OF[neighbour], 0))
+        elif kind in (PieceAtk.TIGER, PieceAtk.LION) and (jump := JUMPS[position][direction]):
+            result.append((SQUARE_OF[jump[0]], sum(BITS[SQUARE_OF[river]] for river in jump[1])))
+
+    # Return the result
+    return tuple(result)
+
+def _can_defeat(attacker, attacker_atk, victim, victim_atk):
+    '''
+    Check if an attacker kind can defeat a victim kind, mirroring the piece classes.
+
+    Args:
+        attacker (int): The attacker kind.
+        attacker_atk (int): The current attack power of the attacker.
+        victim (int): The victim kind.
+        victim_atk (int): The current attack power of the victim.
+
+    Returns:
+        bool: True if the attacker can defeat the victim, False otherwise.
+    '''
+    if attacker == PieceAtk.RAT:
+        return victim == PieceAtk.ELEPHANT and attacker_atk != 0 or attacker_atk >= victim_atk
+    if attacker == PieceAtk.ELEPHANT:
+        return victim_atk == 0 if victim == PieceAtk.RAT else attacker_atk >= victim_atk
+    return attacker_atk >= victim_atk
+
+def _piece_square(code, square):
+    '''
+    Build the value of a piece code on a square for the positional evaluator.
+
+    Args:
+        code (int): The piece code.
+        square (int): The square.
+
+    Returns:
+        int: The attack power of the piece times 10, plus its den distance, trap danger and river control terms.
+    '''
+    # Get the kind, the side, the label and the distance to the opponent's den
+    kind = KIND_OF_CODE[code]
+    side = SIDES[SIDE_OF_CODE[code]]
+    position = POSITIONS[square]
+    label = LABELS[position]
+    den = PlayerSide.opponent_den_position(side)
+    distance = abs(position[0] - den[0]) + abs(position[1] - den[1])
+
+    # Reward every step towards the opponent's den
+    value = (common.W // 2 + common.H - 1 - distance) * DEN_WEIGHT
+
+    # A piece in an opponent trap has no attack power and can be captured by any piece
+    value += -TRAP_DANGER if CellLabel.is_opponent_trap(label, side) else kind * 10
+
+    # Reward the swimmers in the river and the jumpers on its banks
+    if CellLabel.is_river(label) or kind in (PieceAtk.TIGER, PieceAtk.LION) and any(JUMPS[position]):
+        value += RIVER_CONTROL
+
+    # Return the value
+    return value
+
+# Zobrist keys per piece code and square, for the side to move and per forbidden move code
+_random = random.Random(20240115)
+ZOBRIST_PIECES = [[_random.getrandbits(64) if code else 0 for _ in range(SQUARES)] for code in range(CODES)]
+ZOBRIST_SIDE = _random.getrandbits(64)
+ZOBRIST_FORBIDDEN = [_random.getrandbits(64) for _ in range(64 * 64)]
+
+# Destinations per piece code and square, and capture rules indexed by kind * 2 + trapped
+STEPS = [tuple(_steps(KIND_OF_CODE[code], square) for square in range(SQUARES)) if code else () for code in range(CODES)]
+CAPTURES = [[bool(attacker) and bool(victim) and _can_defeat(attacker // 2, 0 if attacker & 1 else attacker // 2, victim // 2, 0 if victim & 1 else victim // 2) for victim in range(18)] for attacker in range(18)]
+
+# Values per piece code and square for the positional evaluator, and the largest positional gain of a capture
+DEN_WEIGHT = 3
+TRAP_DANGER = 5
+RIVER_CONTROL = 6
+PIECE_SQUARE = [[_piece_square(code, square) for square in range(SQUARES)] if code else [0] * SQUARES for code in range(CODES)]
+POSITIONAL = [[value - (0 if BITS[square] & OPPONENT_TRAPS[SIDE_OF_CODE[code]] else KIND_OF_CODE[code] * 10) for square, value in enumerate(values)] for code, values in enumerate(PIECE_SQUARE)]
+POSITIONAL_MARGIN = max(map(max, POSITIONAL)) + max(POSITIONAL[code][target] - POSITIONAL[code][source] for code in range(1, CODES) for source in range(SQUARES) for target, _ in STEPS[code][source])
+
+class Bitboard:
+    '''
+    Bitboard class.
+
+    A compact position made of one bitmask per piece code, one occupancy mask per side and a 63-byte mailbox.
+    Squares are numbered x * H + y, so they follow the same order as the cells of the board.
+
+    Attributes:
+    - mailbox (bytearray): The piece code on each square.
+    - masks (list): The bitmask of each piece code.
+    - occupied (list): The occupancy bitmask of each side.
+    - history (list): The undo stack of packed moves.
+    - forbidden (int): The forbidden move code, -1 if there is none.
+    - atk (list): The total attack power of each side, pieces in an opponent trap count as 0.
+    - pst (list): The total piece-square value of each side.
+    - hash (int): The Zobrist key of the pieces, the side to move and the forbidden move.
+    - status (PlayerSide): The cached winner of the position, UNKNOWN until it is checked.
+    - CHECK (bool): True to validate the incremental state against a full recomputation after every move, False otherwise.
+
+    Methods:
+    - __init__: Constructor of the class.
+    - place: Place a piece on an empty square.
+    - copy: Return a copy of the bitboard.
+    - get_valid_moves: Get the valid moves for the given side.
+    - has_valid_move: Check if the given side has at least one valid move.
+    - make_move: Make a move on the bitboard.
+    - undo_move: Undo the last move on the bitboard.
+    - get_forbidden: Get the forbidden move code.
+    - validate: Check the incremental state against a full recomputation.
+    - atk_of: Get the total attack power of the given side.
+    - pst_of: Get the total piece-square value of the given side.
+    - piece_atk: Get the base attack power of the piece at the given position.
+    - is_opponent_pieceless: Check if the given side has no pieces left.
+    - is_opponent_den_invaded: Check if the opponent's den is invaded.
+    - get_winner: Get the winner of the game in a single pass.
+    - is_dark_win: Check if the dark side wins.
+    - is_light_win: Check if the light side wins.
+    - is_game_over: Check if the game is over.
+    - winner: Get the winner of the game.
+    '''
+    CHECK = False
+
+    def __init__(self, board=None):
+        '''
+        Constructor of the class.
+
+        Args:
+            board (Board): The board to read the pieces and the move history from, None for an empty bitboard.
+
+        Returns:
+            Bitboard: A new Bitboard instance.
+        '''
+        self.mailbox = bytearray(SQUARES)
+        self.masks = [0] * CODES
+        self.occupied = [0, 0]
+        self.history = []
+        self.forbidden = -1
+        self.atk = [0, 0]
+        self.pst = [0, 0]
+        self.hash = 0
+        self.status = UNKNOWN
+
+        # Read the board
+        if board:
+            # Place the pieces
+            for square, position in enumerate(POSITIONS):
+                if piece := board.get_cell(position).piece:
+                    self.place(KIND_OF_PIECE[type(piece)] + SIDE_INDEX[piece.side] * 8, square)
+
+            # Replay the move history, captures before the copy cannot be undone
+            self.history = [SQUARE_OF[move[0]] << 6 | SQUARE_OF[move[1]] for move in board.move_history]
+            self.forbidden = self.get_forbidden()
+
+            # Hash the side to move, the light side moves first
+            if len(self.history) & 1:
+                self.hash ^= ZOBRIST_SIDE
+            if self.forbidden >= 0:
+                self.hash ^= ZOBRIST_FORBIDDEN[self.forbidden]
+
+    def place(self, code, square):
+        '''
+        Place a piece on an empty square.
+
+        Args:
+            code (int): The piece code.
+            square (int): The square.
+        '''
+        index = SIDE_OF_CODE[code]
+        self.mailbox[square] = code
+        self.masks[code] |= BITS[square]
+        self.occupied[index] |= BITS[square]
+        if not BITS[square] & OPPONENT_TRAPS[index]:
+            self.atk[index] += KIND_OF_CODE[code]
+        self.pst[index] += PIECE_SQUARE[code][square]
+        self.hash ^= ZOBRIST_PIECES[code][square]
+
+    def copy(self):
+        '''
+        Return a copy of the bitboard.
+
+        Returns:
+            Bitboard: A new Bitboard instance.
+        '''
+        result = Bitboard()
+        result.mailbox[:] = self.mailbox
+        result.masks = self.masks.copy()
+        result.occupied = self.occupied.copy()
+        result.history = self.history.copy()
+        result.forbidden = self.forbidden
+        result.atk = self.atk.copy()
+        result.pst = self.pst.copy()
+        result.hash = self.hash
+        result.status = self.status
+        return result
+
+    def get_valid_moves(self, side):
+        '''
+        Get the valid moves for the given side.
+
+        Args:
+            side (PlayerSide): The side of the player.
+
+        Returns:
+            list: A list of valid moves for the given side.
+        '''
+        # Initialize the result and the local lookups
+        result = []
+        index = SIDE_INDEX[side]
+        mailbox = self.mailbox
+        own = self.occupied[index]
+        occupied = own | self.occupied[1 - index]
+        trapped = OPPONENT_TRAPS[index]
+        victim_trapped = OPPONENT_TRAPS[1 - index]
+        forbidden = self.forbidden
+
+        # Iterate through the pieces of the side
+        pieces = own
+        while pieces:
+            # Pop the lowest piece
+            low = pieces & -pieces
+            pieces ^= low
+            source = low.bit_length() - 1
+            code = mailbox[source]
+            captures = CAPTURES[KIND_OF_CODE[code] * 2 + (low & trapped and 1)]
+
+            # Iterate through the destinations of the piece
+            for target, block in STEPS[code][source]:
+                # Skip the jump if a piece swims in the river
+                if block & occupied:
+                    continue
+
+                # Skip own pieces and pieces that cannot be defeated
+                if victim := mailbox[target]:
+                    if BITS[target] & own or not captures[KIND_OF_CODE[victim] * 2 + (BITS[target] & victim_trapped and 1)]:
+                        continue
+
+                # Add the move unless it is forbidden
+                if (move := source << 6 | target) != forbidden:
+                    result.append(MOVES[move])
+
+        # Return the result
+        return result
+
+    def has_valid_move(self, side):
+        '''
+        Check if the given side has at least one valid move, stopping at the first one found.
+
+        Args:
+            side (PlayerSide): The side of the player.
+
+        Returns:
+            bool: Whether the side has a valid move.
+        '''
+        # Initialize the local lookups
+        index = SIDE_INDEX[side]
+        mailbox = self.mailbox
+        own = self.occupied[index]
+        occupied = own | self.occupied[1 - index]
+        trapped = OPPONENT_TRAPS[index]
+        victim_trapped = OPPONENT_TRAPS[1 - index]
+        forbidden = self.forbidden
+
+        # Iterate through the pieces of the side
+        pieces = own
+        while pieces:
+            # Pop the lowest piece
+            low = pieces & -pieces
+            pieces ^= low
+            source = low.bit_length() - 1
+            code = mailbox[source]
+            captures = CAPTURES[KIND_OF_CODE[code] * 2 + (low & trapped and 1)]
+
+            # Iterate through the destinations of the piece
+            for target, block in STEPS[code][source]:
+                # Skip blocked jumps, own pieces and pieces that cannot be defeated
+                if block & occupied:
+                    continue
+                if victim := mailbox[target]:
+                    if BITS[target] & own or not captures[KIND_OF_CODE[victim] * 2 + (BITS[target] & victim_trapped and 1)]:
+                        continue
+
+                # Return True at the first move that is not forbidden
+                if source << 6 | target != forbidden:
+                    return True
+
+        # Return False if no move was found
+        return False
+
+    def make_move(self, move):
+        '''
+        Make a move on the bitboard.
+
+        Args:
+            move (tuple): The move to make.
+        '''
+        # Get the source and target squares
+        source = SQUARE_OF[move[0]]
+        target = SQUARE_OF[move[1]]
+        mailbox, masks, occupied = self.mailbox, self.masks, self.occupied
+        code = mailbox[source]
+        captured = mailbox[target]
+        index = SIDE_OF_CODE[code]
+
+        key = self.hash ^ ZOBRIST_SIDE ^ ZOBRIST_PIECES[code][source] ^ ZOBRIST_PIECES[code][target]
+
+        # Remove the captured piece, a piece in an opponent trap has no attack power to lose
+        if captured:
+            masks[captured] ^= BITS[target]
+            occupied[1 - index] ^= BITS[target]
+            if not BITS[target] & OPPONENT_TRAPS[1 - index]:
+                self.atk[1 - index] -= KIND_OF_CODE[captured]
+            self.pst[1 - index] -= PIECE_SQUARE[captured][target]
+            key ^= ZOBRIST_PIECES[captured][target]
+
+        # Move the piece from the source square to the target square
+        masks[code] ^= BITS[source] | BITS[target]
+        occupied[index] ^= BITS[source] | BITS[target]
+        mailbox[source] = 0
+        mailbox[target] = code
+
+        # Update the attack power when the piece leaves or enters an opponent trap
+        if (BITS[source] | BITS[target]) & OPPONENT_TRAPS[index]:
+            self.atk[index] += KIND_OF_CODE[code] if BITS[source] & OPPONENT_TRAPS[index] else -KIND_OF_CODE[code]
+        self.pst[index] += PIECE_SQUARE[code][target] - PIECE_SQUARE[code][source]
+
+        # Update the move history and the forbidden move
+        self.history.append(captured << 12 | source << 6 | target)
+        self.hash = key ^ self.forbidden_key
+        self.forbidden = self.get_forbidden()
+        self.hash ^= self.forbidden_key
+        self.status = UNKNOWN
+
+        # Validate the incremental state
+        if Bitboard.CHECK:
+            self.validate()
+
+    def undo_move(self, move):
+        '''
+        Undo the last move on the bitboard.
+
+        Args:
+            move (tuple): The move to undo, it must be the last move made.
+        '''
+        # Get the source and target squares and the captured piece
+        entry = self.history.pop()
+        source = entry >> 6 & 63
+        target = entry & 63
+        captured = entry >> 12
+        mailbox, masks, occupied = self.mailbox, self.masks, self.occupied
+        code = mailbox[target]
+        index = SIDE_OF_CODE[code]
+
+        key = self.hash ^ ZOBRIST_SIDE ^ ZOBRIST_PIECES[code][source] ^ ZOBRIST_PIECES[code][target] ^ self.forbidden_key
+
+        # Move the piece from the target square back to the source square
+        masks[code] ^= BITS[source] | BITS[target]
+        occupied[index] ^= BITS[source] | BITS[target]
+        mailbox[source] = code
+        mailbox[target] = captured
+
+        # Restore the attack power when the piece goes back into or out of an opponent trap
+        if (BITS[source] | BITS[target]) & OPPONENT_TRAPS[index]:
+            self.atk[index] -= KIND_OF_CODE[code] if BITS[source] & OPPONENT_TRAPS[index] else -KIND_OF_CODE[code]
+        self.pst[index] -= PIECE_SQUARE[code][target] - PIECE_SQUARE[code][source]
+
+        # Restore the captured piece
+        if captured:
+            masks[captured] ^= BITS[target]
+            occupied[1 - index] ^= BITS[target]
+            if not BITS[target] & OPPONENT_TRAPS[1 - index]:
+                self.atk[1 - index] += KIND_OF_CODE[captured]
+            self.pst[1 - index] += PIECE_SQUARE[captured][target]
+            key ^= ZOBRIST_PIECES[captured][target]
+
+        # Update the forbidden move
+        self.forbidden = self.get_forbidden()
+        self.hash = key ^ self.forbidden_key
+        self.status = UNKNOWN
+
+        # Validate the incremental state
+        if Bitboard.CHECK:
+            self.validate()
+
+    def get_forbidden(self):
+        '''
+        Get the forbidden move code, a move repeated on each of the last 3 turns of the side to move.
+
+        Returns:
+            int: The forbidden move code, -1 if there is none.
+        '''
+        history = self.history
+        return history[-4] & MOVE_MASK if len(history) >= 12 and history[-4] & MOVE_MASK == history[-8] & MOVE_MASK == history[-12] & MOVE_MASK else -1
+
+    def validate(self):
+        '''
+        Check the incremental state against a full recomputation from the mailbox and the move history.
+
+        Raises:
+            RuntimeError: If the masks, the attack power, the piece-square values, the forbidden move or the hash are out of sync.
+        '''
+        # Recompute the masks, the attack power and the hash of the pieces
+        masks = [0] * CODES
+        occupied = [0, 0]
+        atk = [0, 0]
+        pst = [0, 0]
+        key = 0
+        for square, code in enumerate(self.mailbox):
+            if code:
+                index = SIDE_OF_CODE[code]
+                masks[code] |= BITS[square]
+                occupied[index] |= BITS[square]
+                atk[index] += 0 if BITS[square] & OPPONENT_TRAPS[index] else KIND_OF_CODE[code]
+                pst[index] += PIECE_SQUARE[code][square]
+                key ^= ZOBRIST_PIECES[code][square]
+
+        # Add the side to move and the forbidden move to the hash
+        forbidden = self.get_forbidden()
+        if len(self.history) & 1:
+            key ^= ZOBRIST_SIDE
+        if forbidden >= 0:
+            key ^= ZOBRIST_FORBIDDEN[forbidden]
+
+        # Compare the incremental state with the recomputation
+        for name, expected, actual in (('masks', masks, self.masks), ('occupied', occupied, self.occupied), ('atk', atk, self.atk), ('pst', pst, self.pst), ('forbidden', forbidden, self.forbidden), ('hash', key, self.hash)):
+            if expected != actual:
+                raise RuntimeError(f'Bitboard {name} is out of sync: expected {expected}, got {actual}')
+
+    def atk_of(self, side):
+        '''
+        Get the total attack power of the given side, pieces in an opponent trap count as 0.
+
+        Args:
+            side (PlayerSide): The side of the player.
+
+        Returns:
+            int: The total attack power.
+        '''
+        return self.atk[SIDE_INDEX[side]]
+
+    def pst_of(self, side):
+        '''
+        Get the total piece-square value of the given side.
+
+        Args:
+            side (PlayerSide): The side of the player.
+
+        Returns:
+            int: The total piece-square value.
+        '''
+        return self.pst[SIDE_INDEX[side]]
+
+    def piece_atk(self, position):
+        '''
+        Get the base attack power of the piece at the given position.
+
+        Args:
+            position (tuple): The position.
+
+        Returns:
+            int: The base attack power, 0 if the square is empty.
+        '''
+        return KIND_OF_CODE[self.mailbox[SQUARE_OF[position]]]
+
+    def is_opponent_pieceless(self, side):
+        '''
+        Check if the given side has no pieces left.
+
+        Args:
+            side (PlayerSide): The side of the player.
+
+        Returns:
+            bool: Whether the side has no pieces left.
+        '''
+        return not self.occupied[SIDE_INDEX[side]]
+
+    def is_opponent_den_invaded(self, side):
+        '''
+        Check if the opponent's den is invaded.
+
+        Args:
+            side (PlayerSide): The side of the player.
+
+        Returns:
+            bool: Whether the opponent's den is invaded.
+        '''
+        index = SIDE_INDEX[side]
+        return bool(self.occupied[index] & OPPONENT_DENS[index])
+
+    @property
+    def forbidden_move(self):
+        '''
+        Get the forbidden move.
+
+        Returns:
+            tuple: The forbidden move.
+        '''
+        return MOVES[self.forbidden] if self.forbidden >= 0 else None
+
+    @property
+    def forbidden_key(self):
+        '''
+        Get the Zobrist key of the forbidden move.
+
+        Returns:
+            int: The Zobrist key, 0 if there is no forbidden move.
+        '''
+        return ZOBRIST_FORBIDDEN[self.forbidden] if self.forbidden >= 0 else 0
+
+    @property
+    def move_history(self):
+        '''
+        Get the move history.
+
+        Returns:
+            list: The moves made on the bitboard.
+        '''
+        return [MOVES[entry & MOVE_MASK] for entry in self.history]
+
+    @property
+    def ply(self):
+        '''
+        Get the number of moves made.
+
+        Returns:
+            int: The number of moves made.
+        '''
+        return len(self.history)
+
+    @property
+    def last_capture(self):
+        '''
+        Check if the last move captured a piece.
+
+        Returns:
+            bool: Whether the last move captured a piece.
+        '''
+        return bool(self.history) and self.history[-1] >> 12 != 0
+
+    def get_winner(self):
+        '''
+        Get the winner of the game in a single pass, checking the dark side first.
+
+        Returns:
+            PlayerSide: The winner of the game, None if the game is not over.
+        '''
+        # Check den invasion and piecelessness before looking for a valid move
+        if self.is_opponent_den_invaded(PlayerSide.DARK) or self.is_opponent_pieceless(PlayerSide.LIGHT) or not self.has_valid_move(PlayerSide.LIGHT):
+            return PlayerSide.DARK
+        if self.is_opponent_den_invaded(PlayerSide.LIGHT) or self.is_opponent_pieceless(PlayerSide.DARK) or not self.has_valid_move(PlayerSide.DARK):
+            return PlayerSide.LIGHT
+        return None
+
+    @property
+    def is_dark_win(self):
+        '''
+        Check if the dark side wins.
+
+        Returns:
+            bool: Whether the dark side wins.
+        '''
+        return self.is_opponent_den_invaded(PlayerSide.DARK) or self.is_opponent_pieceless(PlayerSide.LIGHT) or not self.has_valid_move(PlayerSide.LIGHT)
+
+    @property
+    def is_light_win(self):
+        '''
+        Check if the light side wins.
+
+        Returns:
+            bool: Whether the light side wins.
+        '''
+        return self.is_opponent_den_invaded(PlayerSide.LIGHT) or self.is_opponent_pieceless(PlayerSide.DARK) or not self.has_valid_move(PlayerSide.DARK)
+
+    @property
+    def is_game_over(self):
+        '''
+        Check if the game is over.
+
+        Returns:
+            bool: Whether the game is over.
+        '''
+        return self.winner is not None
+
+    @property
+    def winner(self):
+        '''
+        Get the winner of the game, cached until the next move.
+
+        Returns:
+            PlayerSide: The winner of the game.
+        '''
+        if self.status is UNKNOWN:
+            self.status = self.get_winner()
+        return self.status
@@ -1,3 +1,4 @@
+import scripts.bitboard as bitboard
 import scripts.cell as cell
 import scripts.common as common
 import scripts.pieces.rat as rat
@@ -16,11 +17,12 @@ class Board:
     
     Attributes:
     - cells (list): The cells of the board.
-    - pieces (list): The pieces on the board.
-    - pieces_of (dict): The pieces of each player.
+    - pieces (list): The pieces on the board, rebuilt from the cells on the first read after a move.
+    - pieces_of (dict): The pieces of each player, rebuilt from the cells on the first read after a move.
     - captured_pieces (list): The captured pieces.
     - move_history (list): The move history.
     - forbidden_move (tuple): The forbidden move.
+    - bitboard (Bitboard): The compact position kept in sync with the cells.
     
     Methods:
     - __init__: Constructor of the class.
@@ -31,12 +33,19 @@ class Board:
     - make_move: Make a move on the board.
     - undo_move: Undo a move on the board.
     - update_pieces: Update the pieces on the board.
+    - pieces: Get the pieces on the board.
+    - pieces_of: Get the pieces of each player.
+    - validate: Check the bitboard against a full recomputation from the cells.
+    - atk_of: Get the total attack power of the given side.
+    - pst_of: Get the total piece-square value of the given side.
+    - piece_atk: Get the base attack power of the piece at the given position.
     - is_opponent_pieceless: Check if the opponent has no pieces left.
     - is_opponent_den_invaded: Check if the opponent's den is invaded.
     - is_dark_win: Check if the dark side wins.
     - is_light_win: Check if the light side wins.
     - is_game_over: Check if the game is over.
     - winner: Get the winner of the game.
+    - hash: Get the Zobrist key of the board.
     '''
     
     def __init__(self, with_pieces=True, is_copy=False):
@@ -133,6 +142,7 @@ class Board:
         self.move_history = []
         self.captured_pieces = []
         self.forbidden_move = None
+        self.bitboard = bitboard.Bitboard(self)
         self.update_pieces()
 
     def copy(self):
@@ -146,6 +156,8 @@ class Board:
         result = Board(False, True)
         result.cells = [[cell.copy() for cell in row] for row in self.cells]
         result.move_history = self.move_history.copy()
+        result.forbidden_move = self.forbidden_move
+        result.bitboard = self.bitboard.copy()
         result.update_pieces()
 
         # Copy the captured pieces
@@ -173,7 +185,7 @@ class Board:
         Returns:
             list: A list of valid moves for the given side.
         '''
-        return [(pin.position, cell.position) for pin in self.pieces_of[side] for cell in pin.available_cells(self) if (pin.position, cell.position) != self.forbidden_move]
+        return self.bitboard.get_valid_moves(side)
 
     def get_forbidden(self):
         '''
@@ -211,7 +223,14 @@ class Board:
         # Update the move history
         self.move_history.append(move)
         self.forbidden_move = self.get_forbidden()
-        self.update_pieces()
+        self.bitboard.make_move(move)
+
+        # Leave the pieces to be rebuilt on their next read
+        self._pieces_of = None
+
+        # Validate the bitboard against the cells
+        if bitboard.Bitboard.CHECK:
+            self.validate()
 
     def undo_move(self, move):
         '''
@@ -229,28 +248,116 @@ class Board:
         target_cell.remove_piece()
         
         # Restore the captured piece if it exists
-        if self.captured_pieces and self.captured_pieces[-1][1] == move[1]:
+        if self.bitboard.last_capture and self.captured_pieces and self.captured_pieces[-1][1] == move[1]:
             captured_piece, _ = self.captured_pieces.pop()
             target_cell.add_piece(captured_piece)
         
         # Update the move history
-        self.move_history.remove(move)
-        self.update_pieces()
+        self.move_history.pop()
+        self.forbidden_move = self.get_forbidden()
+        self.bitboard.undo_move(move)
+
+        # Leave the pieces to be rebuilt on their next read
+        self._pieces_of = None
+
+        # Validate the bitboard against the cells
+        if bitboard.Bitboard.CHECK:
+            self.validate()
 
     def update_pieces(self):
         '''
         Update the pieces on the board.
         '''
         # Get the pieces on the board
-        self.pieces = [cell.piece for row in self.cells for cell in row if cell.piece]
-        self.pieces_of = {
+        self._pieces = [cell.piece for row in self.cells for cell in row if cell.piece]
+        self._pieces_of = {
             PlayerSide.DARK: [],
             PlayerSide.LIGHT: []
         }
         
         # Update the pieces of each player
-        for piece in self.pieces:
-            self.pieces_of[piece.side].append(piece)
+        for piece in self._pieces:
+            self._pieces_of[piece.side].append(piece)
+
+    @property
+    def pieces(self):
+        '''
+        Get the pieces on the board, rebuilding them from the cells after a move.
+        
+        Returns:
+            list: The pieces on the board.
+        '''
+        if self._pieces_of is None:
+            self.update_pieces()
+        return self._pieces
+
+    @property
+    def pieces_of(self):
+        '''
+        Get the pieces of each player, rebuilding them from the cells after a move.
+        
+        Returns:
+            dict: The pieces of each player.
+        '''
+        if self._pieces_of is None:
+            self.update_pieces()
+        return self._pieces_of
+
+    def validate(self):
+        '''
+        Check the bitboard against a full recomputation from the cells.
+        
+        Raises:
+            RuntimeError: If the pieces, the attack power or the den occupancy of the bitboard are out of sync with the cells.
+        '''
+        # Check the incremental state of the bitboard
+        self.bitboard.validate()
+        
+        # Compare the pieces, the attack power and the den occupancy with the cells
+        for side in (PlayerSide.DARK, PlayerSide.LIGHT):
+            occupied = self.bitboard.occupied[bitboard.SIDE_INDEX[side]]
+            if sorted(piece.position for piece in self.pieces_of[side]) != [position for square, position in enumerate(bitboard.POSITIONS) if occupied & bitboard.BITS[square]]:
+                raise RuntimeError(f'Bitboard pieces of {side} are out of sync with the cells')
+            if sum(piece.atk for piece in self.pieces_of[side]) != self.bitboard.atk_of(side):
+                raise RuntimeError(f'Bitboard attack power of {side} is out of sync with the cells')
+            if any(piece.position == PlayerSide.opponent_den_position(side) for piece in self.pieces_of[side]) != self.bitboard.is_opponent_den_invaded(side):
+                raise RuntimeError(f'Bitboard den occupancy of {side} is out of sync with the cells')
+
+    def atk_of(self, side):
+        '''
+        Get the total attack power of the given side.
+        
+        Args:
+            side (PlayerSide): The side of the player.
+        
+        Returns:
+            int: The total attack power.
+        '''
+        return self.bitboard.atk_of(side)
+
+    def pst_of(self, side):
+        '''
+        Get the total piece-square value of the given side.
+        
+        Args:
+            side (PlayerSide): The side.
+        
+        Returns:
+            int: The total piece-square value.
+        '''
+        return self.bitboard.pst_of(side)
+
+    def piece_atk(self, position):
+        '''
+        Get the base attack power of the piece at the given position.
+        
+        Args:
+            position (tuple): The position.
+        
+        Returns:
+            int: The base attack power, 0 if the cell is empty.
+        '''
+        return self.bitboard.piece_atk(position)
 
     def is_opponent_pieceless(self, side):
         '''
@@ -262,7 +369,7 @@ class Board:
         Returns:
             bool: Whether the opponent has no pieces left.
         '''
-        return not self.pieces_of[side]
+        return self.bitboard.is_opponent_pieceless(side)
 
     def is_opponent_den_invaded(self, side):
         '''
@@ -274,8 +381,28 @@ class Board:
         Returns:
             bool: Whether the opponent's den is invaded.
         '''
-        return self.get_cell(PlayerSide.opponent_den_position(side)).is_occupied_own(side)
+        return self.bitboard.is_opponent_den_invaded(side)
     
+    @property
+    def ply(self):
+        '''
+        Get the number of moves made.
+        
+        Returns:
+            int: The number of moves made.
+        '''
+        return len(self.move_history)
+
+    @property
+    def hash(self):
+        '''
+        Get the Zobrist key of the board.
+        
+        Returns:
+            int: The Zobrist key of the pieces, the side to move and the forbidden move.
+        '''
+        return self.bitboard.hash
+
     @property
     def forbidden_cell(self):
         '''
@@ -294,15 +421,7 @@ class Board:
         Returns:
             bool: Whether the dark side wins.
         '''
-        # Get the available moves for the light side
-        available_moves = self.get_valid_moves(PlayerSide.LIGHT)
-
-        # Remove the forbidden move if it exists
-        if self.forbidden_move and self.forbidden_move in available_moves:
-            available_moves.remove(self.forbidden_move)
-        
-        # Check if the dark side wins
-        return self.is_opponent_den_invaded(PlayerSide.DARK) or self.is_opponent_pieceless(PlayerSide.LIGHT) or len(available_moves) == 0
+        return self.bitboard.is_dark_win
     
     @property
     def is_light_win(self):
@@ -312,15 +431,7 @@ class Board:
         Returns:
             bool: Whether the light side wins.
         '''
-        # Get the available moves for the dark side
-        available_moves = self.get_valid_moves(PlayerSide.DARK)
-
-        # Remove the forbidden move if it exists
-        if self.forbidden_move and self.forbidden_move in available_moves:
-            available_moves.remove(self.forbidden_move)
-        
-        # Check if the light side wins
-        return self.is_opponent_den_invaded(PlayerSide.LIGHT) or self.is_opponent_pieceless(PlayerSide.DARK) or len(available_moves) == 0
+        return self.bitboard.is_light_win
     
     @property
     def is_game_over(self):
@@ -330,7 +441,7 @@ class Board:
         Returns:
             bool: Whether the game is over.
         '''
-        return self.is_dark_win or self.is_light_win
+        return self.bitboard.is_game_over
     
     @property
     def winner(self):
@@ -340,4 +451,4 @@ class Board:
         Returns:
             PlayerSide: The winner of the game.
         '''
-        return PlayerSide.DARK if self.is_dark_win else PlayerSide.LIGHT if self.is_light_win else None
+        return self.bitboard.winner
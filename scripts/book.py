@@ -0,0 +1,159 @@
+import argparse
+import glob
+import os
+import random
+import numpy
+import scripts.bitboard as bitboard
+from scripts.board import *
+from scripts.log import *
+from scripts.records import *
+
+BOOK_PATH = 'opening_book.bin'
+BOOK_MAGIC = b'ACBOOK01'
+BOOK_HEADER = numpy.dtype([('magic', 'S8'), ('start', '<u8'), ('size', '<u8')])
+BOOK_ENTRY = numpy.dtype([('key', '<u8'), ('move', '<u2'), ('count', '<u4'), ('wins', '<u4')])
+
+class OpeningBook:
+    '''
+    The opening book.
+
+    A memory-mapped file of entries sorted by position hash, each with a move, the number of games
+    that played it and the number of those games won by the side that played it.
+
+    Attributes:
+    - path (str): The book path.
+    - entries (numpy.ndarray): The memory-mapped entries, empty if there is no book.
+
+    Methods:
+    - __init__(self, path): Open the book.
+    - probe(self, board, side): Get the book moves of a position.
+    - choose(self, board, side, min_count): Choose a book move of a position.
+    - build(paths, book_path, max_ply): Build the book from the game logs.
+    '''
+
+    def __init__(self, path=BOOK_PATH):
+        '''
+        Open the book.
+
+        Args:
+            path (str): The book path.
+
+        Returns:
+            OpeningBook: The book, empty if the file is missing or was built for other hash keys.
+        '''
+        self.path = path
+        self.entries = numpy.zeros(0, dtype=BOOK_ENTRY)
+
+        # Check the header, the hash keys of the book must match the hash keys of the bitboard
+        if not os.path.isfile(path) or os.path.getsize(path) < BOOK_HEADER.itemsize:
+            return
+        header = numpy.fromfile(path, dtype=BOOK_HEADER, count=1)[0]
+        if header['magic'] != BOOK_MAGIC or header['start'] != Board(is_copy=True).hash or not header['size']:
+            return
+
+        # Map the entries
+        self.entries = numpy.memmap(path, dtype=BOOK_ENTRY, mode='r', offset=BOOK_HEADER.itemsize, shape=(int(header['size']),))
+
+    def probe(self, board, side):
+        '''
+        Get the book moves of a position.
+
+        Args:
+            board (Board): The board.
+            side (PlayerSide): The side to move.
+
+        Returns:
+            list: The valid book moves with their number of games and win rate, the most played first.
+        '''
+        # Find the entries of the position
+        keys = self.entries['key']
+        start = numpy.searchsorted(keys, board.hash, 'left')
+        end = numpy.searchsorted(keys, board.hash, 'right')
+        if start == end:
+            return []
+
+        # Keep the valid moves, the hash may collide
+        moves = board.get_valid_moves(side)
+        result = [(bitboard.MOVES[int(entry['move'])], int(entry['count']), int(entry['wins']) / int(entry['count'])) for entry in self.entries[start:end]]
+        return sorted((entry for entry in result if entry[0] in moves), key=lambda entry: -entry[1])
+
+    def choose(self, board, side, min_count=2):
+        '''
+        Choose a book move of a position, weighted by the number of games and the win rate.
+
+        Args:
+            board (Board): The board.
+            side (PlayerSide): The side to move.
+            min_count (int): The minimum number of games of a book move.
+
+        Returns:
+            tuple: The book move, None if the position is out of the book.
+        '''
+        # Get the book moves played often enough
+        entries = [entry for entry in self.probe(board, side) if entry[1] >= min_count]
+        if not entries:
+            return None
+
+        # Weight the moves by their number of wins, or by their number of games if none of them won
+        weights = [count * win_rate for _, count, win_rate in entries]
+        return random.choices([entry[0] for entry in entries], weights=any(weights) and weights or [entry[1] for entry in entries])[0]
+
+    @staticmethod
+    def build(paths, book_path=BOOK_PATH, max_ply=16):
+        '''
+        Build the book from the game logs.
+
+        Args:
+            paths (list): The CSV paths of the logs.
+            book_path (str): The book path.
+            max_ply (int): The number of moves of each game to add.
+
+        Returns:
+            int: The number of entries.
+        '''
+        # Count the moves of each position
+        start = Board(is_copy=True).bitboard
+        stats = {}
+        for _, winner, moves, _ in GameRecords.read_csv(paths):
+            # Replay the opening of the game
+            board = start.copy()
+            side = PlayerSide.LIGHT
+            winner = Log.enum_to_side(winner)
+            for packed in moves[:max_ply]:
+                # Stop at the first move that does not fit the position
+                move = bitboard.MOVES[packed]
+                if move not in board.get_valid_moves(side):
+                    break
+
+                # Count the move and the win of the side that played it
+                entry = stats.setdefault((board.hash, packed), [0, 0])
+                entry[0] += 1
+                entry[1] += winner == side
+
+                # Make the move
+                board.make_move(move)
+                side = PlayerSide.opponent_of(side)
+
+        # Sort the entries by position hash
+        entries = numpy.array([(key, move, count, wins) for (key, move), (count, wins) in stats.items()], dtype=BOOK_ENTRY)
+        entries.sort(order=['key', 'move'])
+
+        # Write the book atomically
+        with open(f'{book_path}.tmp', 'wb') as file:
+            numpy.array([(BOOK_MAGIC, start.hash, len(entries))], dtype=BOOK_HEADER).tofile(file)
+            entries.tofile(file)
+        os.replace(f'{book_path}.tmp', book_path)
+
+        # Return the number of entries
+        return len(entries)
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Build the opening book from the game logs.')
+    parser.add_argument('paths', nargs='*', default=sorted(glob.glob('dark_*.csv')), help='the CSV logs, dark_*.csv by default')
+    parser.add_argument('-o', '--output', default=BOOK_PATH, help='the book path')
+    parser.add_argument('-p', '--max-ply', type=int, default=16, help='the number of moves of each game to add')
+    args = parser.parse_args()
+
+    # Build the book
+    print(f'{OpeningBook.build(args.paths, args.output, args.max_ply)} entries written to {args.output}')
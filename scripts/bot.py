@@ -1,19 +1,54 @@
+import multiprocessing
+import scripts.bitboard as bitboard
 from collections import *
+from concurrent.futures import *
 from queue import *
 from scripts.common import *
+from scripts.geometry import *
+from scripts.search import *
 
 class Bot:
     '''
     The bot.
 
+    Attributes:
+    - DELTA_MARGIN (dict): The positional gain allowed on top of the material gain of a capture before delta pruning skips it, per evaluator.
+
     Methods:
     - get_move(self, board): Get the move.
+    - evaluate(board, current_side, evaluator): Evaluate the position of the board with the given evaluator.
     - evaluate_position(board, current_side): Evaluate the position of the board.
-    - minimax(board, current_side, depth, maximizing_player): Minimax algorithm.
-    - minimax_alpha_beta_pruning(board, current_side, depth, alpha, beta, maximizing_player): Minimax algorithm with alpha-beta pruning.
+    - evaluate_positional(board, current_side): Evaluate the position of the board with the piece-square tables.
+    - minimax(board, current_side, depth, maximizing_player, evaluator): Minimax algorithm.
+    - order_moves(board, moves, side, ply, context, hash_move): Order the moves so the most promising are searched first.
+    - minimax_alpha_beta_pruning(board, current_side, depth, alpha, beta, maximizing_player, context): Minimax algorithm with alpha-beta pruning.
+    - quiescence(board, current_side, depth, alpha, beta, maximizing_player, context): Quiescence search over the captures and the den threats.
+    - iterative_deepening(board, current_side, max_depth, context): Iterative deepening around the alpha-beta search.
+    - parallel_search(board, current_side, depth, workers, quiescence_depth, evaluator): Alpha-beta search with the root moves split across processes.
+    - search_root_move(board, current_side, move, depth, alpha, context): Search a root move with the alpha-beta search.
+    - principal_variation(board, current_side, table, depth): Get the principal variation from the transposition table.
     - breadth_first_search(board, piece, start, ends): Breadth-first search algorithm.
     - a_star_search(board, piece, start, ends): A* search algorithm.
     '''
+    DELTA_MARGIN = {
+        Evaluator.MATERIAL: 0,
+        Evaluator.POSITIONAL: bitboard.POSITIONAL_MARGIN,
+    }
+
+    @staticmethod
+    def evaluate(board, current_side, evaluator=Evaluator.MATERIAL):
+        '''
+        Evaluate the position of the board with the given evaluator.
+        
+        Args:
+            board (Board): The board.
+            current_side (PlayerSide): The current side.
+            evaluator (Evaluator): The evaluator, None for the material evaluator.
+        
+        Returns:
+            int: The score.
+        '''
+        return Bot.evaluate_positional(board, current_side) if Evaluator.is_positional(evaluator) else Bot.evaluate_position(board, current_side)
 
     @staticmethod
     def evaluate_position(board, current_side):
@@ -27,22 +62,50 @@ class Bot:
         Returns:
             int: The score.
         '''
-        # Initialize the score
+        # Initialize the score and the opponent side
         score = 0
+        opponent_side = PlayerSide.opponent_of(current_side)
         
         # Check if the current player's den is invaded by the opponent
         if board.is_opponent_den_invaded(current_side):
             score += 900
         
         # Check if the opponent's den is invaded by the current player
-        if board.is_opponent_den_invaded(PlayerSide.opponent_of(current_side)):
+        if board.is_opponent_den_invaded(opponent_side):
             score -= 900
         
-        # Iterate through the pieces
-        return score + sum((piece.side == current_side and piece.atk * 10 or -piece.atk * 10) for piece in board.pieces)
+        # Add the attack power balance of the pieces
+        return score + (board.atk_of(current_side) - board.atk_of(opponent_side)) * 10
     
     @staticmethod
-    def minimax(board, current_side, depth, maximizing_player):
+    def evaluate_positional(board, current_side):
+        '''
+        Evaluate the position of the board with the piece-square tables.
+        
+        Args:
+            board (Board): The board.
+            current_side (PlayerSide): The current side.
+        
+        Returns:
+            int: The score.
+        '''
+        # Initialize the score and the opponent side
+        score = 0
+        opponent_side = PlayerSide.opponent_of(current_side)
+        
+        # Check if the current player's den is invaded by the opponent
+        if board.is_opponent_den_invaded(current_side):
+            score += 900
+        
+        # Check if the opponent's den is invaded by the current player
+        if board.is_opponent_den_invaded(opponent_side):
+            score -= 900
+        
+        # Add the piece-square balance of the pieces
+        return score + board.pst_of(current_side) - board.pst_of(opponent_side)
+
+    @staticmethod
+    def minimax(board, current_side, depth, maximizing_player, evaluator=Evaluator.MATERIAL):
         '''
         Minimax algorithm.
         
@@ -51,6 +114,7 @@ class Bot:
             current_side (PlayerSide): The current side.
             depth (int): The depth.
             maximizing_player (bool): The maximizing player.
+            evaluator (Evaluator): The evaluator of the positions.
         
         Returns:
             tuple: The best evaluation and the best moves.
@@ -60,7 +124,7 @@ class Bot:
 
         # Base case
         if depth == 0 or board.is_game_over:
-            return Bot.evaluate_position(board, current_side), best_moves
+            return Bot.evaluate(board, current_side, evaluator), best_moves
         
         # Recursive case
         if maximizing_player:
@@ -74,7 +138,7 @@ class Bot:
         for move in board.get_valid_moves(player_side):
             # Make the move
             board.make_move(move)
-            eval, _ = Bot.minimax(board, current_side, depth - 1, not maximizing_player)
+            eval, _ = Bot.minimax(board, current_side, depth - 1, not maximizing_player, evaluator)
             board.undo_move(move)
 
             # Update the best evaluation and the best moves
@@ -95,7 +159,55 @@ class Bot:
         return best_eval, best_moves
 
     @staticmethod
-    def minimax_alpha_beta_pruning(board, current_side, depth, alpha, beta, maximizing_player):
+    def order_moves(board, moves, side, ply=0, context=None, hash_move=None):
+        '''
+        Order the moves so the most promising are searched first.
+
+        The hash move comes first, then the move of the previous principal variation, the den entries,
+        the captures by most valuable victim and least valuable attacker, the killer moves,
+        the escapes from the opponent's traps and the other moves by their history heuristic.
+        Moves of the same rank keep their generation order.
+        
+        Args:
+            board (Board): The board.
+            moves (list): The valid moves.
+            side (PlayerSide): The side to move.
+            ply (int): The ply of the moves from the root.
+            context (SearchContext): The search context with the killer moves and the history heuristic, None to order without them.
+            hash_move (tuple): The best move stored in the transposition table, None if there is none.
+        
+        Returns:
+            list: The ordered moves.
+        '''
+        # Get the killer moves, the history heuristic and the principal variation move of the ply
+        killers = context and context.killers.get(ply) or ()
+        history = context and context.history or {}
+        pv_move = context and ply < len(context.pv) and context.pv[ply] or None
+        den = PlayerSide.opponent_den_position(side)
+        traps = OPPONENT_TRAPS[side]
+        piece_atk = board.piece_atk
+
+        # Rank a move
+        def rank(move):
+            if move == hash_move:
+                return 1_000_000
+            if move == pv_move:
+                return 950_000
+            if move[1] == den:
+                return 900_000
+            if victim := piece_atk(move[1]):
+                return 100_000 + victim * 10 - piece_atk(move[0])
+            if move in killers:
+                return 90_000 - killers.index(move)
+            if move[0] in traps:
+                return 80_000
+            return min(history.get(move, 0), 70_000)
+
+        # Return the moves from the best rank to the worst
+        return sorted(moves, key=rank, reverse=True)
+
+    @staticmethod
+    def minimax_alpha_beta_pruning(board, current_side, depth, alpha, beta, maximizing_player, context=None):
         '''
         Minimax algorithm with alpha-beta pruning.
         
@@ -106,17 +218,57 @@ class Bot:
             alpha (int): The alpha value.
             beta (int): The beta value.
             maximizing_player (bool): The maximizing player.
+            context (SearchContext): The search context with the transposition table and the budget, None to search without one.
         
         Returns:
             tuple: The best evaluation and the best moves.
+        
+        Raises:
+            SearchAborted: If the budget of the context runs out.
         '''
         # Initialize the best moves
         best_moves = []
+        table = context and context.table
+
+        # Return the score of the endgame tablebases if the position is decided
+        if context and context.tablebase and not board.is_game_over:
+            side_to_move = current_side if maximizing_player else PlayerSide.opponent_of(current_side)
+            if (score := context.tablebase.probe_score(board, side_to_move, current_side)) is not None:
+                return score, best_moves
+
+        # Resolve the captures and the den threats at the horizon
+        if depth == 0 and context and context.quiescence_depth and not board.is_game_over:
+            return Bot.quiescence(board, current_side, context.quiescence_depth, alpha, beta, maximizing_player, context), best_moves
+
+        # Count the node
+        if context:
+            context.visit()
 
         # Base case
         if depth == 0 or board.is_game_over:
-            return Bot.evaluate_position(board, current_side), best_moves
+            return Bot.evaluate(board, current_side, context and context.evaluator), best_moves
         
+        # Probe the transposition table, scores are stored for the side to move
+        alpha_start, beta_start = alpha, beta
+        hash_move = None
+        if table:
+            if entry := table.probe(board.hash):
+                entry_depth, bound, score, hash_move = entry
+                if entry_depth >= depth:
+                    # Convert the entry to the point of view of the current side
+                    if not maximizing_player:
+                        score, bound = -score, Bound.flip(bound)
+
+                    # Narrow the window or return the stored score
+                    if bound == Bound.EXACT:
+                        return score, hash_move and [hash_move] or best_moves
+                    elif bound == Bound.LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if beta < alpha:
+                        return score, hash_move and [hash_move] or best_moves
+
         # Recursive case
         if maximizing_player:
             best_eval = float('-inf')
@@ -125,11 +277,18 @@ class Bot:
             best_eval = float('inf')
             player_side = PlayerSide.opponent_of(current_side)
 
+        # Order the valid moves, the frontier nodes only need the hash move first
+        ply = context and board.ply - context.root_ply or 0
+        moves = board.get_valid_moves(player_side)
+        if depth > 1 or hash_move:
+            moves = Bot.order_moves(board, moves, player_side, ply, context, hash_move)
+
         # Iterate through the valid moves
-        for move in board.get_valid_moves(player_side):
+        for move in moves:
             # Make the move
+            capture = board.piece_atk(move[1])
             board.make_move(move)
-            eval, _ = Bot.minimax_alpha_beta_pruning(board, current_side, depth - 1, alpha, beta, not maximizing_player)
+            eval, _ = Bot.minimax_alpha_beta_pruning(board, current_side, depth - 1, alpha, beta, not maximizing_player, context)
             board.undo_move(move)
 
             # Update the best evaluation and the best moves
@@ -154,13 +313,250 @@ class Bot:
                 # Update beta
                 beta = min(beta, eval)
 
+            # Prune the tree, remembering the quiet move that caused the cutoff
+            if beta < alpha:
+                if context and not capture:
+                    context.add_cutoff(move, ply, depth)
+                break
+
+        # Store the result for the side to move
+        if table and best_moves:
+            bound = Bound.UPPER if best_eval <= alpha_start else Bound.LOWER if best_eval >= beta_start else Bound.EXACT
+            table.store(board.hash, depth, bound if maximizing_player else Bound.flip(bound), best_eval if maximizing_player else -best_eval, best_moves[0])
+
+        # Return the best evaluation and the best moves
+        return best_eval, best_moves
+
+    @staticmethod
+    def quiescence(board, current_side, depth, alpha, beta, maximizing_player, context=None):
+        '''
+        Quiescence search over the captures and the den threats.
+
+        Only the captures, the entries into the opponent's traps and the den entries are searched.
+        The side to move may stand pat on the evaluation, and the captures that cannot bring
+        the evaluation back into the window are skipped.
+        
+        Args:
+            board (Board): The board.
+            current_side (PlayerSide): The current side.
+            depth (int): The maximum remaining depth.
+            alpha (int): The alpha value.
+            beta (int): The beta value.
+            maximizing_player (bool): The maximizing player.
+            context (SearchContext): The search context with the budget, None to search without one.
+        
+        Returns:
+            int: The best evaluation.
+        
+        Raises:
+            SearchAborted: If the budget of the context runs out.
+        '''
+        # Count the node
+        if context:
+            context.visit()
+
+        # Stand pat on the evaluation
+        evaluator = context and context.evaluator or Evaluator.MATERIAL
+        stand_pat = Bot.evaluate(board, current_side, evaluator)
+        if depth == 0 or board.is_game_over:
+            return stand_pat
+
+        # Return the stand pat if it already fails, otherwise narrow the window
+        if maximizing_player:
+            if stand_pat > beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            player_side = current_side
+        else:
+            if stand_pat < alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
+            player_side = PlayerSide.opponent_of(current_side)
+
+        # Initialize the best evaluation, the den and the traps of the opponent
+        best_eval = stand_pat
+        den = PlayerSide.opponent_den_position(player_side)
+        traps = OPPONENT_TRAPS[player_side]
+
+        # Iterate through the captures and the den threats
+        for move in Bot.order_moves(board, board.get_valid_moves(player_side), player_side):
+            # Skip the quiet moves
+            victim = board.piece_atk(move[1])
+            if not victim and move[1] != den and move[1] not in traps:
+                continue
+
+            # Skip the captures that cannot reach the window, the attacker may also leave a trap
+            if victim and move[1] not in traps:
+                gain = (victim + (move[0] in traps and board.piece_atk(move[0]))) * 10 + Bot.DELTA_MARGIN[evaluator]
+                if maximizing_player and stand_pat + gain < alpha or not maximizing_player and stand_pat - gain > beta:
+                    continue
+
+            # Make the move
+            board.make_move(move)
+            eval = Bot.quiescence(board, current_side, depth - 1, alpha, beta, not maximizing_player, context)
+            board.undo_move(move)
+
+            # Update the best evaluation and the window
+            if maximizing_player:
+                best_eval = max(best_eval, eval)
+                alpha = max(alpha, eval)
+            else:
+                best_eval = min(best_eval, eval)
+                beta = min(beta, eval)
+
             # Prune the tree
             if beta < alpha:
                 break
 
+        # Return the best evaluation
+        return best_eval
+
+    @staticmethod
+    def iterative_deepening(board, current_side, max_depth, context=None):
+        '''
+        Iterative deepening around the alpha-beta search.
+        
+        Args:
+            board (Board): The board.
+            current_side (PlayerSide): The current side.
+            max_depth (int): The maximum depth.
+            context (SearchContext): The search context with the time and node budget, None for no budget.
+        
+        Returns:
+            tuple: The best evaluation and the best moves of the deepest completed iteration.
+        '''
+        # Initialize the context and the result
+        context = context or SearchContext()
+        context.root_ply = board.ply
+        best_eval, best_moves = Bot.evaluate(board, current_side, context.evaluator), []
+
+        # Play the moves of the endgame tablebases if the position is decided
+        if context.tablebase and (result := context.tablebase.best_moves(board, current_side)) and result[0]:
+            return result
+
+        # Deepen the search until the maximum depth or the budget is reached
+        for depth in range(1, max_depth + 1):
+            try:
+                eval, moves = Bot.minimax_alpha_beta_pruning(board, current_side, depth, float('-inf'), float('inf'), True, context)
+            except SearchAborted:
+                # Undo the moves of the aborted iteration
+                while board.ply > context.root_ply:
+                    board.undo_move(board.move_history[-1])
+                break
+
+            # Keep the result and seed the next iteration with its principal variation
+            best_eval, best_moves = eval, moves
+            context.depth = depth
+            context.pv = Bot.principal_variation(board, current_side, context.table, depth)
+
+            # Stop once the game is decided
+            if not moves:
+                break
+
         # Return the best evaluation and the best moves
         return best_eval, best_moves
 
+    @staticmethod
+    def parallel_search(board, current_side, depth, workers=None, quiescence_depth=SearchContext.QUIESCENCE_DEPTH, evaluator=Evaluator.MATERIAL):
+        '''
+        Alpha-beta search with the root moves split across processes.
+
+        Each worker process keeps its own transposition table and starts every root move from the best
+        evaluation found so far by any worker. The result only depends on the position, so a single
+        process gives the same evaluation and the same best moves, in the same order.
+        
+        Args:
+            board (Board): The board.
+            current_side (PlayerSide): The current side.
+            depth (int): The depth.
+            workers (int): The number of worker processes, None for one per CPU, 1 to search in this process.
+            quiescence_depth (int): The maximum depth of the quiescence search at the horizon, 0 to evaluate the horizon directly.
+            evaluator (Evaluator): The evaluator of the positions.
+        
+        Returns:
+            tuple: The best evaluation and the best moves.
+        '''
+        # Return the evaluation if there is nothing to search
+        if depth == 0 or board.is_game_over:
+            return Bot.evaluate(board, current_side, evaluator), []
+
+        # Order the root moves so the best evaluation rises early
+        moves = Bot.order_moves(board, board.get_valid_moves(current_side), current_side)
+        workers = min(workers or multiprocessing.cpu_count(), len(moves))
+
+        # Search the root moves in this process
+        if workers <= 1:
+            alpha = float('-inf')
+            context = SearchContext(quiescence_depth=quiescence_depth, evaluator=evaluator)
+            evals = []
+            for move in moves:
+                evals.append(Bot.search_root_move(board, current_side, move, depth, alpha, context))
+                alpha = max(alpha, evals[-1])
+
+        # Search the root moves in the worker processes, sharing the best evaluation
+        else:
+            alpha = multiprocessing.Value('d', float('-inf'))
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(board, current_side, alpha, quiescence_depth, evaluator)) as executor:
+                evals = list(executor.map(_search_root_move, moves, [depth] * len(moves)))
+
+        # Return the best evaluation and the best moves, the other moves may only be bounds below it
+        best_eval = max(evals)
+        return best_eval, [move for move, eval in zip(moves, evals) if eval == best_eval]
+
+    @staticmethod
+    def search_root_move(board, current_side, move, depth, alpha, context=None):
+        '''
+        Search a root move with the alpha-beta search.
+        
+        Args:
+            board (Board): The board.
+            current_side (PlayerSide): The current side.
+            move (tuple): The root move.
+            depth (int): The depth of the root.
+            alpha (int): The best evaluation of the root so far.
+            context (SearchContext): The search context, None to search without one.
+        
+        Returns:
+            int: The evaluation of the move, exact if it is not below alpha.
+        '''
+        board.make_move(move)
+        try:
+            if context:
+                context.root_ply = board.ply - 1
+            eval, _ = Bot.minimax_alpha_beta_pruning(board, current_side, depth - 1, alpha, float('inf'), False, context)
+        finally:
+            board.undo_move(move)
+        return eval
+
+    @staticmethod
+    def principal_variation(board, current_side, table, depth):
+        '''
+        Get the principal variation from the transposition table.
+        
+        Args:
+            board (Board): The board.
+            current_side (PlayerSide): The side to move.
+            table (TranspositionTable): The transposition table.
+            depth (int): The maximum length of the variation.
+        
+        Returns:
+            list: The moves of the principal variation.
+        '''
+        # Follow the best moves stored in the table
+        pv = []
+        side = current_side
+        while len(pv) < depth and (entry := table.probe(board.hash)) and entry[3] in board.get_valid_moves(side):
+            pv.append(entry[3])
+            board.make_move(entry[3])
+            side = PlayerSide.opponent_of(side)
+
+        # Restore the board
+        for move in reversed(pv):
+            board.undo_move(move)
+
+        # Return the principal variation
+        return pv
+
     @staticmethod
     def breadth_first_search(board, piece, start, ends):
         '''
@@ -272,3 +668,42 @@ class Bot:
                         pq.put((estimated_cost, new_path_cost, path + [cell.position]))
         
         return paths or None, None
+
+
+# The state of a worker process of the parallel search
+_worker = {}
+
+def _init_worker(board, current_side, alpha, quiescence_depth, evaluator):
+    '''
+    Initialize a worker process of the parallel search.
+
+    Args:
+        board (Board): The board.
+        current_side (PlayerSide): The current side.
+        alpha (Synchronized): The best evaluation of the root shared by the workers.
+        quiescence_depth (int): The maximum depth of the quiescence search at the horizon.
+        evaluator (Evaluator): The evaluator of the positions.
+    '''
+    _worker.update(board=board, current_side=current_side, alpha=alpha, context=SearchContext(quiescence_depth=quiescence_depth, evaluator=evaluator))
+
+def _search_root_move(move, depth):
+    '''
+    Search a root move in a worker process of the parallel search.
+
+    Args:
+        move (tuple): The root move.
+        depth (int): The depth of the root.
+
+    Returns:
+        int: The evaluation of the move, exact if it is not below the shared alpha it started from.
+    '''
+    # Search from the best evaluation found so far
+    alpha = _worker['alpha']
+    eval = Bot.search_root_move(_worker['board'], _worker['current_side'], move, depth, alpha.value, _worker['context'])
+
+    # Share the evaluation if it is the best so far
+    with alpha.get_lock():
+        alpha.value = max(alpha.value, eval)
+
+    # Return the evaluation
+    return eval
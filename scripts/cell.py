@@ -1,5 +1,4 @@
 import scripts.common as common
-from pygame import *
 from scripts.common import *
 from scripts.pieces.rat import *
 from scripts.pieces.cat import *
@@ -17,7 +16,7 @@ class Cell:
     Attributes:
     - label (CellLabel): The label.
     - position (tuple): The position.
-    - image (Surface): The image.
+    - image (str): The image path, loaded by the rendering layer.
     - piece (Piece): The piece.
     
     Methods:
@@ -76,7 +75,7 @@ class Cell:
         Args:
             image_path (str): The image path.
         '''
-        self.image = transform.scale(image.load(image_path), Size.CELL)
+        self.image = image_path
 
     def add_piece(self, piece):
         '''
@@ -212,6 +212,62 @@ class GameState:
         '''
         return state == GameState.OVER
 
+class Bound:
+    '''
+    The bound type of a search score.
+
+    Attributes:
+    - EXACT (int): The score is exact.
+    - LOWER (int): The score is a lower bound.
+    - UPPER (int): The score is an upper bound.
+
+    Methods:
+    - flip(bound): Get the bound seen from the other side.
+    '''
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+    @staticmethod
+    def flip(bound):
+        '''
+        Get the bound seen from the other side.
+
+        Args:
+            bound (int): The bound.
+
+        Returns:
+            int: The flipped bound.
+        '''
+        return Bound.UPPER if bound == Bound.LOWER else Bound.LOWER if bound == Bound.UPPER else bound
+
+class Evaluator:
+    '''
+    The evaluators of the search.
+
+    Attributes:
+    - MATERIAL (str): The attack power balance and the den invasions.
+    - POSITIONAL (str): The piece-square tables and the den invasions.
+
+    Methods:
+    - is_positional(evaluator): Check if the evaluator is the positional evaluator.
+    '''
+    MATERIAL = 'Material'
+    POSITIONAL = 'Positional'
+
+    @staticmethod
+    def is_positional(evaluator):
+        '''
+        Check if the evaluator is the positional evaluator.
+
+        Args:
+            evaluator (str): The evaluator.
+
+        Returns:
+            bool: True if the evaluator is the positional evaluator, False otherwise.
+        '''
+        return evaluator == Evaluator.POSITIONAL
+
 class PlayerSide:
     '''
     The side of the player.
@@ -0,0 +1,69 @@
+import scripts.common as common
+from scripts.common import *
+
+# Every position of the board, in the same order as the cells of the board
+POSITIONS = tuple((x, y) for x in range(common.W) for y in range(common.H))
+
+# The directions in the order of the piece probes: left, right, up and down
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# The river positions
+RIVERS = frozenset((
+    CellPosition.RIVER_1_1, CellPosition.RIVER_1_2, CellPosition.RIVER_1_3, CellPosition.RIVER_1_4, CellPosition.RIVER_1_5, CellPosition.RIVER_1_6,
+    CellPosition.RIVER_2_1, CellPosition.RIVER_2_2, CellPosition.RIVER_2_3, CellPosition.RIVER_2_4, CellPosition.RIVER_2_5, CellPosition.RIVER_2_6,
+))
+
+# The trap positions that cancel the attack power of each side
+OPPONENT_TRAPS = {
+    PlayerSide.DARK: frozenset((CellPosition.LIGHT_TRAP_1, CellPosition.LIGHT_TRAP_2, CellPosition.LIGHT_TRAP_3)),
+    PlayerSide.LIGHT: frozenset((CellPosition.DARK_TRAP_1, CellPosition.DARK_TRAP_2, CellPosition.DARK_TRAP_3)),
+}
+
+# The label of each position
+LABELS = {position: CellLabel.EMPTY for position in POSITIONS}
+LABELS.update({position: CellLabel.RIVER for position in RIVERS})
+LABELS.update({position: CellLabel.DARK_TRAP for position in OPPONENT_TRAPS[PlayerSide.LIGHT]})
+LABELS.update({position: CellLabel.LIGHT_TRAP for position in OPPONENT_TRAPS[PlayerSide.DARK]})
+LABELS.update({CellPosition.DARK_DEN: CellLabel.DARK_DEN, CellPosition.LIGHT_DEN: CellLabel.LIGHT_DEN})
+
+def _neighbours(position):
+    '''
+    Build the orthogonal neighbours of a position.
+
+    Args:
+        position (tuple): The position.
+
+    Returns:
+        tuple: The neighbour in each direction, None if it is off the board.
+    '''
+    return tuple((position[0] + dx, position[1] + dy) if 0 <= position[0] + dx < common.W and 0 <= position[1] + dy < common.H else None for dx, dy in DIRECTIONS)
+
+def _jump(position, direction):
+    '''
+    Build the river jump from a land position in a direction.
+
+    Args:
+        position (tuple): The position.
+        direction (int): The direction index.
+
+    Returns:
+        tuple: The landing position and the river positions in between, None if there is no river to jump.
+    '''
+    # Return None if the position is in the river
+    if position in RIVERS:
+        return None
+
+    # Walk over the river
+    dx, dy = DIRECTIONS[direction]
+    rivers = []
+    current = (position[0] + dx, position[1] + dy)
+    while current in RIVERS:
+        rivers.append(current)
+        current = (current[0] + dx, current[1] + dy)
+
+    # Return the landing position if a river was crossed and the landing is on the board
+    return rivers and 0 <= current[0] < common.W and 0 <= current[1] < common.H and (current, tuple(rivers)) or None
+
+# The neighbour and the river jump of each position in each direction
+NEIGHBOURS = {position: _neighbours(position) for position in POSITIONS}
+JUMPS = {position: tuple(_jump(position, direction) for direction in range(len(DIRECTIONS))) for position in POSITIONS}
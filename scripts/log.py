@@ -1,24 +1,39 @@
-import os
-import pandas
+import argparse
+import random
+import time
 import uuid
-from datetime import *
 from pandas import *
+from scripts.board import *
 from scripts.bot import *
 from scripts.common import *
+from scripts.scoring import *
+from scripts.shards import *
+
+COLUMNS = ['id', 'board', 'side', 'piece', 'atk', 'move', 'river', 'trap', 'den', 'score', 'winner']
 
 class Log:
     '''
     The log.
 
+    The records are buffered as plain rows and the data frame is only built when it is read or saved,
+    so each record costs the same however long the game is. When the scores are deferred, a record only holds
+    the move and its position, the positions of the game are scored in one batch on saving, or left empty
+    for an offline pass of scripts.scoring.
+
     Attributes:
     - id (str): The ID.
-    - df (DataFrame): The data frame.
+    - rows (list): The buffered records, one tuple per move in the order of the columns.
+    - writer (ShardWriter): The writer of the saved records.
+    - deferred (bool): True to score the positions on saving rather than on each move, False otherwise.
+    - scorer (function): The scorer of the deferred positions on saving, None to save them without a score.
+    - df (DataFrame): The data frame of the buffered records.
     
     Methods:
-    - __init__(self): Initialize the log.
+    - __init__(self, writer, deferred, scorer): Initialize the log.
     - new_df(self): Create a new data frame.
     - insert_chess_record(self, board, move): Insert the chess record.
-    - save(self): Save the chess record to a CSV file.
+    - save(self): Save the chess record to the current shard.
+    - benchmark(lengths, seed): Measure the cost of each record for several game lengths.
     - map_piece_name(piece): Map the piece name.
     - side_to_enum(side): Convert the side to enum.
     - enum_to_side(enum): Convert the enum to side.
@@ -32,24 +47,39 @@ class Log:
     - board_to_enum(board): Convert the board to enum.
     '''
 
-    def __init__(self):
+    def __init__(self, writer=None, deferred=False, scorer=None):
         '''
         Initialize the log.
         
+        Args:
+            writer (ShardWriter): The writer of the saved records, None for dark_*.csv shards in the working directory.
+            deferred (bool): True to score the positions on saving rather than on each move, False otherwise.
+            scorer (function): The scorer of the deferred positions on saving, as Scoring.scorer gives it, None to save them without a score.
+        
         Returns:
             Log: The log.
         '''
+        self.writer = writer or ShardWriter(COLUMNS)
+        self.deferred = deferred
+        self.scorer = scorer
         self.new_df()
 
     def new_df(self):
         '''
-        Create a new data frame.
+        Create a new data frame, emptying the buffer.
+        '''
+        self.id = str(uuid.uuid4())
+        self.rows = []
+
+    @property
+    def df(self):
+        '''
+        Build the data frame of the buffered records.
         
         Returns:
             DataFrame: The data frame.
         '''
-        self.id = str(uuid.uuid4())
-        self.df = DataFrame(columns=['id', 'board', 'side', 'piece', 'atk', 'move', 'river', 'trap', 'den', 'score', 'winner'])
+        return DataFrame(self.rows, columns=COLUMNS)
 
     def insert_chess_record(self, board, move):
         '''
@@ -60,27 +90,75 @@ class Log:
             move (tuple): The move.
         '''
         cell = board.get_cell(move[1])
-        self.df = pandas.concat([self.df, DataFrame([{
-            'id': self.id,
-            'board': Log.board_to_enum(board),
-            'side': Log.side_to_enum(cell.piece.side),
-            'piece': Log.cell_piece_to_enum(cell),
-            'atk': cell.piece.atk,
-            'move': Log.move_to_enum(move),
-            'river': Log.cell_river_to_enum(cell),
-            'trap': Log.cell_trap_to_enum(cell),
-            'den': Log.cell_den_to_enum(cell),
-            'score': Bot.evaluate_position(board, PlayerSide.DARK),
-            'winner': Log.side_to_enum(board.winner)
-        }])], ignore_index=True)
+        self.rows.append((
+            self.id,
+            Log.board_to_enum(board),
+            Log.side_to_enum(cell.piece.side),
+            Log.cell_piece_to_enum(cell),
+            cell.piece.atk,
+            Log.move_to_enum(move),
+            Log.cell_river_to_enum(cell),
+            Log.cell_trap_to_enum(cell),
+            Log.cell_den_to_enum(cell),
+            None if self.deferred else Bot.evaluate_position(board, PlayerSide.DARK),
+            Log.side_to_enum(board.winner)
+        ))
 
     def save(self):
         '''
-        Save the chess record to a CSV file.
+        Save the chess record to the current shard, the records of a game always stay in the same shard.
         '''
-        self.df.to_csv(f'dark_{datetime.now().second}.csv', mode='a', header=not os.path.isfile(f'dark_{datetime.now().second}.csv'), index=False)
+        # Score the deferred positions of the game together
+        if self.deferred and self.scorer and self.rows:
+            rows = [list(row) for row in self.rows]
+            Scoring.score_rows(rows, self.scorer, True)
+            self.rows = rows
+
+        # Write the records
+        self.writer.write(self.rows)
         self.new_df()
 
+    @staticmethod
+    def benchmark(lengths=(100, 1_000, 10_000), seed=0):
+        '''
+        Measure the cost of each record for several game lengths, random games are played until the log is long enough.
+        
+        Args:
+            lengths (list): The numbers of records.
+            seed (int): The seed of the random games.
+        
+        Returns:
+            list: The number of records, the microseconds of each insertion and the microseconds of each row of the data frame.
+        '''
+        # Initialize the random games and the results
+        rng = random.Random(seed)
+        results = []
+
+        # Fill a log of each length
+        for length in lengths:
+            log = Log()
+            board, side, elapsed = Board(is_copy=True), PlayerSide.LIGHT, 0.0
+            while len(log.rows) < length:
+                # Start a new game when the last one is over
+                if board.is_game_over:
+                    board, side = Board(is_copy=True), PlayerSide.LIGHT
+
+                # Make a random move and time its record
+                move = rng.choice(board.get_valid_moves(side))
+                board.make_move(move)
+                side = PlayerSide.opponent_of(side)
+                start = time.perf_counter()
+                log.insert_chess_record(board, move)
+                elapsed += time.perf_counter() - start
+
+            # Time the data frame
+            start = time.perf_counter()
+            log.df
+            results.append((length, elapsed / length * 1e6, (time.perf_counter() - start) / length * 1e6))
+
+        # Return the results
+        return results
+
     @staticmethod
     def map_piece_name(piece):
         '''
@@ -236,3 +314,13 @@ class Log:
             str: The enum.
         '''
         return ''.join(Log.cell_piece_to_enum(cell) for row in board.cells for cell in row)
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Measure the cost of each logged move as the log grows.')
+    parser.add_argument('lengths', type=int, nargs='*', default=[100, 1_000, 10_000], help='the numbers of records')
+    args = parser.parse_args()
+
+    # Run the benchmark
+    for length, insert, build in Log.benchmark(args.lengths):
+        print(f'{length:>8} records  {insert:8.1f} us per insertion  {build:6.2f} us per row of the data frame')
@@ -1,16 +1,21 @@
 import numpy
 import random
 from scripts.board import *
+from scripts.book import *
 from scripts.bot import *
 from scripts.common import *
 from scripts.log import *
-from tensorflow.keras import models
+from scripts.mcts import *
+from scripts.network import *
+from scripts.tablebase import *
+from scripts.transposition import *
 
 class GameManager:
     '''
     The game manager.
     
     Attributes:
+    - log (Log): The log of the games.
     - board (Board): The board.
     - game_state (GameState): The game state.
     - game_mode (GameMode): The game mode.
@@ -19,6 +24,15 @@ class GameManager:
     - opponent_side (PlayerSide): The opponent side.
     - selected_piece (Piece): The selected piece.
     - focused_piece (Piece): The focused piece.
+    - depth (int): The maximum search depth of the computer.
+    - time_limit (float): The time budget of a computer move in seconds, None for no time limit.
+    - table (TranspositionTable): The transposition table shared by the searches of the computer.
+    - evaluator (Evaluator): The evaluator of the searches of the computer.
+    - book (OpeningBook): The opening book probed before the computer searches.
+    - tablebase (Tablebase): The endgame tablebases probed by the searches of the computer.
+    - model_path (str): The path of the AI model, loaded once per process on its first use.
+    - mcts (MCTS): The Monte Carlo tree search of the computer with the AI model, None until it is first used.
+    - headless (bool): True if the game is played without a display, False otherwise.
     
     Methods:
     - reset_game(self): Reset the game.
@@ -31,23 +45,33 @@ class GameManager:
     - breadth_first_search_moves(self, best_moves): Get the moves using the breadth-first search algorithm.
     - a_star_search_moves(self, best_moves): Get the moves using the A* search algorithm.
     - ai_move(self): Make the computer move using the AI model.
+    - mcts_move(self, simulations): Make the computer move using the Monte Carlo tree search with the AI model.
     - is_game_end(self): Check if the game ends.
     - encode_piece(piece_char): Encode the piece.
     - encode_board(board_str): Encode the board.
     - algorithm_random(opponent_pieces): Get the random algorithm.
     '''
 
-    def __init__(self, game_mode=GameMode.PvC):
+    def __init__(self, game_mode=GameMode.PvC, depth=3, time_limit=None, evaluator=Evaluator.MATERIAL, book_path=BOOK_PATH, tablebase_dir=TABLEBASE_DIR, model_path=MODEL_PATH, warm_up=False, log=None, headless=False):
         '''
         Initialize the game manager.
         
         Args:
             game_mode (GameMode): The game mode.
+            depth (int): The maximum search depth of the computer.
+            time_limit (float): The time budget of a computer move in seconds, None for no time limit.
+            evaluator (Evaluator): The evaluator of the searches of the computer.
+            book_path (str): The opening book path, the book is empty if the file is missing.
+            tablebase_dir (str): The endgame tablebases directory, there are no tablebases if it is missing.
+            model_path (str): The path of the AI model.
+            warm_up (bool): True to load the AI model and run a first prediction now rather than on the first move, False otherwise.
+            log (Log): The log of the games, None for a log scoring each move as it is played.
+            headless (bool): True to play without a display, the player switches are silent, False otherwise.
         
         Returns:
             GameManager: The game manager.
         '''
-        self.log = Log()
+        self.log = log or Log()
         self.board = Board()
         self.game_state = GameState.NEW
         self.game_mode = game_mode
@@ -56,6 +80,19 @@ class GameManager:
         self.opponent_side = PlayerSide.opponent_of(self.current_side)
         self.selected_piece = None
         self.focused_piece = None
+        self.depth = depth
+        self.time_limit = time_limit
+        self.table = TranspositionTable()
+        self.evaluator = evaluator
+        self.book = OpeningBook(book_path)
+        self.tablebase = Tablebase(tablebase_dir)
+        self.model_path = model_path
+        self.mcts = None
+        self.headless = headless
+
+        # Load the AI model before the game starts
+        if warm_up:
+            Network.load(model_path, True)
 
     def reset_game(self):
         '''
@@ -64,15 +101,23 @@ class GameManager:
         self.board = Board()
         self.game_state = GameState.RUNNING
         self.game_result = None
+        self.current_side = PlayerSide.LIGHT
+        self.opponent_side = PlayerSide.opponent_of(self.current_side)
         self.selected_piece = None
 
+        # Forget the searches of the previous game, so a game does not depend on the games before it
+        self.table.clear()
+        if self.mcts:
+            self.mcts.clear()
+
     def switch_player(self):
         '''
         Switch the player.
         '''
         self.current_side, self.opponent_side = self.opponent_side, self.current_side
         self.board.captured_pieces.clear()
-        print('\a')
+        if not self.headless:
+            print('\a')
 
     def handle_piece_focus(self, mouse_position):
         '''
@@ -169,9 +214,13 @@ class GameManager:
         Returns:
             tuple: The best move.
         '''
-        # Get the best moves
-        new_board = self.board.copy()
-        _, best_moves = random.choice([1, 2]) == 1 and Bot.minimax(new_board, self.current_side, 2, True) or Bot.minimax_alpha_beta_pruning(new_board, self.current_side, 2, float('-inf'), float('inf'), True)
+        # Play from the opening book first
+        if book_move := self.book.choose(self.board, self.current_side):
+            return book_move
+
+        # Get the best moves on a compact copy of the board, only the iterative deepening keeping to the time limit
+        new_board = self.board.bitboard.copy()
+        _, best_moves = self.time_limit is None and random.choice([1, 2]) == 1 and Bot.minimax(new_board, self.current_side, self.depth, True, self.evaluator) or Bot.iterative_deepening(new_board, self.current_side, self.depth, SearchContext(self.table, self.time_limit, evaluator=self.evaluator, tablebase=self.tablebase))
 
         # Check if the best moves exist
         if not best_moves:
@@ -267,35 +316,49 @@ class GameManager:
         Returns:
             tuple: The best move.
         '''
-        # Load the best model
-        model = models.load_model('best_model.h5')
+        # Play from the opening book first
+        if book_move := self.book.choose(self.board, self.current_side):
+            return book_move
 
-        # Initialize the best move and the best score
-        best_move = None
-        best_score = float('-inf')
+        # Check if the valid moves exist
+        moves = self.board.get_valid_moves(self.current_side)
+        if not moves:
+            return None
 
-        # Iterate through the valid moves
-        for move in self.board.get_valid_moves(self.current_side):
-            # Copy the board
-            new_board = self.board.copy()
-
-            # Make the move
+        # Collect the position after each valid move on a compact copy of the board
+        new_board = self.board.bitboard.copy()
+        mailboxes = []
+        for move in moves:
             new_board.make_move(move)
+            mailboxes.append(bytes(new_board.mailbox))
+            new_board.undo_move(move)
 
-            # Encode the board
-            board_encoded = GameManager.encode_board(Log.board_to_enum(new_board))
-            board_encoded_reshaped = board_encoded.reshape(1, *board_encoded.shape)
+        # Predict the scores of every position in a single call
+        scores = Network.predict(Network.load(self.model_path), numpy.frombuffer(b''.join(mailboxes), dtype=numpy.uint8).reshape(len(moves), -1))
 
-            # Get the predicted score
-            predicted_score = model.predict(board_encoded_reshaped)
+        # Return the first move with the best score
+        return moves[int(numpy.argmax(scores))]
+
+    def mcts_move(self, simulations=800):
+        '''
+        Make the computer move using the Monte Carlo tree search with the AI model.
+        
+        Args:
+            simulations (int): The simulation budget, the time limit also applies if there is one.
+        
+        Returns:
+            tuple: The best move.
+        '''
+        # Play from the opening book first
+        if book_move := self.book.choose(self.board, self.current_side):
+            return book_move
 
-            # Update the best move and the best score
-            if predicted_score > best_score:
-                best_score = predicted_score
-                best_move = move
+        # Build the search on the first move, the tree is kept for the next moves
+        if not self.mcts:
+            self.mcts = MCTS(MCTS.network_value(Network.load(self.model_path)))
 
-        # Return the best move
-        return best_move
+        # Return the most visited move
+        return self.mcts.search(self.board, self.current_side, simulations, self.time_limit)
 
     @property
     def is_game_end(self):
@@ -345,16 +408,7 @@ class GameManager:
         Returns:
             numpy.ndarray: The board matrix.
         '''
-        # Initialize the board matrix
-        board_matrix = numpy.zeros((9, 7))
-
-        # Iterate through the board string
-        for i, piece in enumerate(board_str[::-1]):
-            row, col = divmod(i, 9)
-            board_matrix[col][row] = GameManager.encode_piece(piece)
-
-        # Return the board matrix
-        return numpy.flip(numpy.flip(board_matrix, 0), 1)
+        return Evaluation.encode_boards([board_str], numpy.float64)[0, :, :, 0]
 
     @staticmethod
     def algorithm_random(opponent_pieces):
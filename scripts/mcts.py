@@ -0,0 +1,312 @@
+import math
+import time
+import numpy
+from scripts.bitboard import *
+from scripts.evaluation import *
+from scripts.network import *
+
+# The score mapped to a value of tanh(1), about 0.76, roughly one elephant and a rat of material
+VALUE_SCALE = 100
+
+class Node:
+    '''
+    A node of the search tree.
+
+    Attributes:
+    - move (tuple): The move that leads to the node, None for the root.
+    - side (PlayerSide): The side that made the move.
+    - prior (float): The prior probability of the move.
+    - children (list): The child nodes, None until the node is expanded.
+    - visits (int): The number of simulations through the node, including the pending ones.
+    - value_sum (float): The sum of the values of the simulations for the side that made the move.
+    - terminal (float): The value of the finished game for the side that made the move, None if the game is running.
+    - pending (bool): True if the node waits for its evaluation in the current batch, False otherwise.
+
+    Methods:
+    - __init__(self, move, side, prior): Initialize the node.
+    - q: Get the mean value of the node.
+    '''
+
+    def __init__(self, move, side, prior=1.0):
+        '''
+        Initialize the node.
+
+        Args:
+            move (tuple): The move that leads to the node, None for the root.
+            side (PlayerSide): The side that made the move.
+            prior (float): The prior probability of the move.
+
+        Returns:
+            Node: The node.
+        '''
+        self.move = move
+        self.side = side
+        self.prior = prior
+        self.children = None
+        self.visits = 0
+        self.value_sum = 0.0
+        self.terminal = None
+        self.pending = False
+
+    @property
+    def q(self):
+        '''
+        Get the mean value of the node.
+
+        Returns:
+            float: The mean value for the side that made the move, 0 if the node is not visited.
+        '''
+        return self.visits and self.value_sum / self.visits
+
+class MCTS:
+    '''
+    The Monte Carlo tree search with PUCT selection and batched leaf evaluation.
+
+    Each round selects up to a batch of leaves, a virtual loss on their paths sends the next selections elsewhere,
+    then scores the leaves with a single call of the value function. The moves have uniform priors since the value
+    network has no policy head. The tree is kept between searches and reused when the game goes through its moves.
+
+    Attributes:
+    - value (function): The value function, mapping the stacked mailboxes of shape (N, 63) to the scores for the dark side.
+    - c_puct (float): The exploration constant.
+    - batch_size (int): The maximum number of leaves evaluated together.
+    - root (Node): The root of the tree, None before the first search.
+    - history (list): The undo stack of the bitboard at the root.
+    - simulations (int): The number of simulations of the last search.
+    - elapsed (float): The time of the last search in seconds.
+
+    Methods:
+    - __init__(self, value, c_puct, batch_size): Initialize the search.
+    - clear(self): Forget the searched tree.
+    - search(self, board, side, simulations, time_limit): Search the position and get the best move.
+    - reuse(self, board, side): Move the root to the position, keeping the subtree that was already searched.
+    - run_batch(self, board): Run the simulations of one batch.
+    - select(node): Select the child to explore.
+    - expand(node, board): Expand a leaf or mark the end of the game.
+    - backpropagate(path, side, value): Add the value of a simulation to its path.
+    - network_value(model): Get the value function of the value network.
+    - static_value(evaluator): Get the value function of the static evaluator.
+    '''
+    C_PUCT = 1.5
+    BATCH_SIZE = 32
+
+    def __init__(self, value=None, c_puct=C_PUCT, batch_size=BATCH_SIZE):
+        '''
+        Initialize the search.
+
+        Args:
+            value (function): The value function, None for the positional evaluator.
+            c_puct (float): The exploration constant.
+            batch_size (int): The maximum number of leaves evaluated together.
+
+        Returns:
+            MCTS: The search.
+        '''
+        self.value = value or MCTS.static_value(Evaluator.POSITIONAL)
+        self.c_puct = c_puct
+        self.batch_size = batch_size
+        self.root = None
+        self.history = []
+        self.simulations = 0
+        self.elapsed = 0.0
+
+    def clear(self):
+        '''
+        Forget the searched tree.
+        '''
+        self.root = None
+        self.history = []
+
+    def search(self, board, side, simulations=800, time_limit=None):
+        '''
+        Search the position and get the best move.
+
+        Args:
+            board (Board): The board or the bitboard.
+            side (PlayerSide): The side to move.
+            simulations (int): The simulation budget, None for no simulation limit.
+            time_limit (float): The time budget in seconds, None for no time limit.
+
+        Returns:
+            tuple: The most visited move, None if the side has no valid move.
+        '''
+        # Search a compact copy of the board from the reused root
+        start = time.perf_counter()
+        board = getattr(board, 'bitboard', board).copy()
+        self.reuse(board, side)
+        self.simulations = 0
+
+        # Run batches until a budget runs out, at least one batch is run
+        while True:
+            self.simulations += self.run_batch(board)
+            if self.root.terminal is not None or simulations and self.simulations >= simulations or time_limit and time.perf_counter() - start >= time_limit:
+                break
+            if not simulations and not time_limit:
+                break
+
+        # Return the most visited move, the better value breaking the ties
+        self.elapsed = time.perf_counter() - start
+        return self.root.children and max(self.root.children, key=lambda child: (child.visits, child.q)).move or None
+
+    def reuse(self, board, side):
+        '''
+        Move the root to the position, keeping the subtree that was already searched.
+
+        Args:
+            board (Bitboard): The bitboard.
+            side (PlayerSide): The side to move.
+        '''
+        # Follow the moves played since the last search
+        node = self.root
+        if node and board.history[:len(self.history)] == self.history:
+            for packed in board.history[len(self.history):]:
+                move = MOVES[packed & MOVE_MASK]
+                node = next((child for child in node.children or [] if child.move == move), None)
+                if not node:
+                    break
+        else:
+            node = None
+
+        # Start a new tree if the position was not searched or the side does not match
+        if not node or node.side == side:
+            node = Node(None, PlayerSide.opponent_of(side))
+
+        # Detach the root
+        node.move = None
+        self.root = node
+        self.history = board.history.copy()
+
+    def run_batch(self, board):
+        '''
+        Run the simulations of one batch, the finished games are scored at once and the other leaves together.
+
+        Args:
+            board (Bitboard): The bitboard at the root.
+
+        Returns:
+            int: The number of simulations.
+        '''
+        # Select the leaves under a virtual loss
+        leaves = []
+        mailboxes = []
+        simulations = 0
+        for _ in range(self.batch_size):
+            # Descend to a leaf
+            node, path = self.root, [self.root]
+            while node.children:
+                node = MCTS.select(node, self.c_puct)
+                board.make_move(node.move)
+                path.append(node)
+
+            # Stop the batch when the selection runs into a leaf that is already waiting
+            if node.pending:
+                for visited in reversed(path[1:]):
+                    board.undo_move(visited.move)
+                break
+
+            # Apply the virtual loss
+            for visited in path:
+                visited.visits += 1
+                visited.value_sum -= 1
+            simulations += 1
+
+            # Score the finished games at once and queue the other leaves
+            if MCTS.expand(node, board) is not None:
+                MCTS.backpropagate(path, node.side, node.terminal)
+            else:
+                node.pending = True
+                leaves.append(path)
+                mailboxes.append(bytes(board.mailbox))
+
+            # Return to the root
+            for visited in reversed(path[1:]):
+                board.undo_move(visited.move)
+
+        # Evaluate the leaves in one call and back up their values
+        if leaves:
+            scores = numpy.asarray(self.value(numpy.frombuffer(b''.join(mailboxes), dtype=numpy.uint8).reshape(-1, SQUARES)), dtype=numpy.float64).reshape(-1)
+            for path, value in zip(leaves, numpy.tanh(scores / VALUE_SCALE)):
+                path[-1].pending = False
+                MCTS.backpropagate(path, PlayerSide.DARK, float(value))
+
+        # Return the number of simulations
+        return simulations
+
+    @staticmethod
+    def select(node, c_puct=C_PUCT):
+        '''
+        Select the child to explore by the PUCT formula.
+
+        Args:
+            node (Node): The expanded node.
+            c_puct (float): The exploration constant.
+
+        Returns:
+            Node: The child with the best mean value plus exploration bonus.
+        '''
+        exploration = c_puct * math.sqrt(node.visits)
+        return max(node.children, key=lambda child: child.q + exploration * child.prior / (1 + child.visits))
+
+    @staticmethod
+    def expand(node, board):
+        '''
+        Expand a leaf or mark the end of the game.
+
+        Args:
+            node (Node): The leaf.
+            board (Bitboard): The bitboard at the leaf.
+
+        Returns:
+            float: The value of the finished game for the side that made the move, None if the game is running.
+        '''
+        # Mark the end of the game
+        if node.terminal is not None:
+            return node.terminal
+        if winner := board.winner:
+            node.terminal = 1.0 if winner == node.side else -1.0
+            return node.terminal
+
+        # Add a child for each valid move with a uniform prior
+        side = PlayerSide.opponent_of(node.side)
+        moves = board.get_valid_moves(side)
+        node.children = [Node(move, side, 1 / len(moves)) for move in moves]
+        return None
+
+    @staticmethod
+    def backpropagate(path, side, value):
+        '''
+        Add the value of a simulation to its path, replacing the virtual loss.
+
+        Args:
+            path (list): The nodes from the root to the leaf.
+            side (PlayerSide): The side of the value.
+            value (float): The value.
+        '''
+        for node in path:
+            node.value_sum += 1 + (value if node.side == side else -value)
+
+    @staticmethod
+    def network_value(model):
+        '''
+        Get the value function of the value network.
+
+        Args:
+            model (Model): The Keras model predicting the score for the dark side.
+
+        Returns:
+            function: The value function.
+        '''
+        return lambda codes: Network.predict(model, codes)
+
+    @staticmethod
+    def static_value(evaluator=Evaluator.POSITIONAL):
+        '''
+        Get the value function of the static evaluator.
+
+        Args:
+            evaluator (Evaluator): The evaluator.
+
+        Returns:
+            function: The value function.
+        '''
+        return lambda codes: Evaluation.evaluate_batch(codes, PlayerSide.DARK, evaluator)
@@ -0,0 +1,370 @@
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import numpy
+from numpy.lib.stride_tricks import sliding_window_view
+from scripts.evaluation import *
+
+MODEL_PATH = 'best_model.h5'
+NPZ_PATH = 'best_model.npz'
+
+# The activations of the NumPy forward pass, Keras uses a slope of 0.2 for leaky_relu by default
+ACTIVATIONS = {
+    'linear': lambda x, alpha: x,
+    'relu': lambda x, alpha: numpy.maximum(x, 0),
+    'leaky_relu': lambda x, alpha: numpy.where(x > 0, x, x * numpy.float32(0.2 if alpha is None else alpha)),
+    'sigmoid': lambda x, alpha: 1 / (1 + numpy.exp(-x)),
+    'tanh': lambda x, alpha: numpy.tanh(x),
+}
+
+class Network:
+    '''
+    The value network, predicting the score of a position for the dark side.
+
+    The model is loaded once per process and shared by every caller, since loading it takes seconds.
+    A .npz export is run by the NumPy forward pass, other paths by Keras.
+
+    Attributes:
+    - models (dict): The loaded model of each process and path.
+
+    Methods:
+    - load(path, warm_up): Get the model of a path, loading it on the first call.
+    - predict(model, boards): Predict the scores of many positions in a single call.
+    - export(model_path, npz_path): Export the weights of a Keras model for the NumPy forward pass.
+    - check(model_path, npz_path, count): Compare the NumPy forward pass with Keras.
+    - benchmark(paths, batch_sizes, repeats): Compare the latency and the memory of the backends.
+    - measure(path, batch_sizes, repeats): Measure a backend in the current process.
+    '''
+    models = {}
+
+    @staticmethod
+    def load(path=MODEL_PATH, warm_up=False):
+        '''
+        Get the model of a path, loading it on the first call of the process.
+
+        Args:
+            path (str): The model path, a .npz export for the NumPy forward pass.
+            warm_up (bool): True to run a first prediction so the graph is built before the first move, False otherwise.
+
+        Returns:
+            Model: The Keras model or the NumPy model.
+        '''
+        # Load the model once per process, a forked worker cannot reuse the model of its parent
+        key = (os.getpid(), path)
+        if key not in Network.models:
+            if path.endswith('.npz'):
+                Network.models[key] = NumpyModel.load(path)
+            else:
+                # Import TensorFlow only when the Keras model is used
+                from tensorflow.keras import models
+                Network.models[key] = models.load_model(path)
+
+            # Build the graph on an empty position
+            if warm_up:
+                Network.models[key].predict_on_batch(numpy.zeros((1, common.H, common.W, 1), dtype=numpy.float32))
+
+        # Return the model
+        return Network.models[key]
+
+    @staticmethod
+    def predict(model, boards):
+        '''
+        Predict the scores of many positions in a single call.
+
+        Args:
+            model (Model): The Keras model or the NumPy model.
+            boards (list): The boards or bitboards, or their stacked mailboxes.
+
+        Returns:
+            numpy.ndarray: The score of each position for the dark side.
+        '''
+        return numpy.asarray(model.predict_on_batch(Evaluation.encode_network(boards))).reshape(-1)
+
+    @staticmethod
+    def export(model_path=MODEL_PATH, npz_path=NPZ_PATH):
+        '''
+        Export the weights of a Keras model for the NumPy forward pass, folding each batch normalization into the layer before it.
+
+        Args:
+            model_path (str): The Keras model path.
+            npz_path (str): The .npz path.
+
+        Returns:
+            list: The layers of the export.
+
+        Raises:
+            ValueError: If the model has a layer the NumPy forward pass does not support.
+        '''
+        # Import TensorFlow only to read the Keras model
+        from tensorflow.keras import models
+        model = models.load_model(model_path)
+
+        # Convert the layers, the dropout is only used in training
+        layers, arrays = [], {}
+        for layer in model.layers:
+            kind, config, weights = type(layer).__name__, layer.get_config(), layer.get_weights()
+            if kind in ('InputLayer', 'Dropout'):
+                continue
+
+            # Keep the kernel and the bias of the convolutions and the dense layers, then their activation
+            if kind in ('Conv2D', 'Dense'):
+                if kind == 'Conv2D' and (tuple(config['strides']) != (1, 1) or tuple(config['dilation_rate']) != (1, 1)):
+                    raise ValueError(f'unsupported convolution {layer.name}')
+                index = len(layers)
+                arrays[f'kernel_{index}'] = weights[0].astype(numpy.float32)
+                arrays[f'bias_{index}'] = (weights[1] if len(weights) > 1 else numpy.zeros(weights[0].shape[-1])).astype(numpy.float32)
+                layers.append({'type': 'conv', 'padding': config['padding']} if kind == 'Conv2D' else {'type': 'dense'})
+                activation = config['activation']
+            elif kind == 'BatchNormalization':
+                # Fold the normalization into the kernel and the bias of the previous layer
+                index = len(layers) - 1
+                if index < 0 or layers[index]['type'] not in ('conv', 'dense'):
+                    raise ValueError(f'unsupported batch normalization {layer.name}')
+                weights = iter(weights)
+                gamma = next(weights) if config['scale'] else 1.0
+                beta = next(weights) if config['center'] else 0.0
+                mean, variance = next(weights), next(weights)
+                scale = gamma / numpy.sqrt(variance + config['epsilon'])
+                arrays[f'kernel_{index}'] = (arrays[f'kernel_{index}'] * scale).astype(numpy.float32)
+                arrays[f'bias_{index}'] = ((arrays[f'bias_{index}'] - mean) * scale + beta).astype(numpy.float32)
+                continue
+            elif kind in ('Activation', 'LeakyReLU', 'ReLU'):
+                activation = config.get('activation', 'leaky_relu' if kind == 'LeakyReLU' else 'relu')
+            elif kind == 'MaxPooling2D':
+                if tuple(config['strides'] or config['pool_size']) != tuple(config['pool_size']) or config['padding'] != 'valid':
+                    raise ValueError(f'unsupported pooling {layer.name}')
+                layers.append({'type': 'pool', 'size': list(config['pool_size'])})
+                continue
+            elif kind == 'Flatten':
+                layers.append({'type': 'flatten'})
+                continue
+            else:
+                raise ValueError(f'unsupported layer {layer.name} of type {kind}')
+
+            # Add the activation, serialized activations keep their name in the class name
+            activation = activation if isinstance(activation, str) else activation.get('config', {}).get('name', activation.get('class_name', '')).lower()
+            if activation not in ACTIVATIONS:
+                raise ValueError(f'unsupported activation {activation} of {layer.name}')
+            if activation != 'linear':
+                layers.append({'type': 'activation', 'name': activation, 'alpha': config.get('negative_slope', config.get('alpha'))})
+
+        # Write the export atomically
+        with open(f'{npz_path}.tmp', 'wb') as file:
+            numpy.savez(file, layers=numpy.array(json.dumps(layers)), **arrays)
+        os.replace(f'{npz_path}.tmp', npz_path)
+
+        # Return the layers
+        return layers
+
+    @staticmethod
+    def check(model_path=MODEL_PATH, npz_path=NPZ_PATH, count=1_000):
+        '''
+        Compare the NumPy forward pass with Keras on random positions.
+
+        Args:
+            model_path (str): The Keras model path.
+            npz_path (str): The .npz path.
+            count (int): The number of positions.
+
+        Returns:
+            float: The largest difference of the predictions relative to the largest Keras prediction.
+        '''
+        # Draw random positions, each square empty or holding a random piece
+        rng = numpy.random.default_rng(0)
+        codes = numpy.where(rng.random((count, SQUARES)) < 0.25, rng.integers(1, CODES, (count, SQUARES)), 0).astype(numpy.uint8)
+
+        # Compare the predictions
+        expected = Network.predict(Network.load(model_path), codes)
+        return float(numpy.abs(expected - Network.predict(Network.load(npz_path), codes)).max() / max(1.0, numpy.abs(expected).max()))
+
+    @staticmethod
+    def benchmark(paths=(MODEL_PATH, NPZ_PATH), batch_sizes=(1, 32, 256), repeats=20):
+        '''
+        Compare the latency and the memory of the backends, each in a fresh process.
+
+        Args:
+            paths (list): The model paths, a .npz export for the NumPy forward pass.
+            batch_sizes (list): The batch sizes.
+            repeats (int): The number of timed predictions of each batch size.
+
+        Returns:
+            list: The measures of each backend.
+        '''
+        # Spawn the processes so no backend is imported before it is measured
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            return [pool.apply(Network.measure, (path, batch_sizes, repeats)) for path in paths]
+
+    @staticmethod
+    def measure(path, batch_sizes=(1, 32, 256), repeats=20):
+        '''
+        Measure a backend in the current process.
+
+        Args:
+            path (str): The model path, a .npz export for the NumPy forward pass.
+            batch_sizes (list): The batch sizes.
+            repeats (int): The number of timed predictions of each batch size.
+
+        Returns:
+            dict: The load time, the median latency of each batch size and the peak resident memory.
+        '''
+        # Time the import and the loading of the model
+        start = time.perf_counter()
+        model = Network.load(path, True)
+        result = {'path': path, 'load_seconds': round(time.perf_counter() - start, 6), 'latency_seconds': {}}
+
+        # Time the predictions of each batch size
+        rng = numpy.random.default_rng(0)
+        for batch_size in batch_sizes:
+            codes = numpy.where(rng.random((batch_size, SQUARES)) < 0.25, rng.integers(1, CODES, (batch_size, SQUARES)), 0).astype(numpy.uint8)
+            Network.predict(model, codes)
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                Network.predict(model, codes)
+                timings.append(time.perf_counter() - start)
+            result['latency_seconds'][batch_size] = round(float(numpy.median(timings)), 6)
+
+        # Add the peak resident memory, in kilobytes on Linux
+        result['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return result
+
+class NumpyModel:
+    '''
+    The NumPy forward pass of an exported value network, without TensorFlow.
+
+    Attributes:
+    - layers (list): The layers, each a dictionary with its type and parameters.
+    - kernels (dict): The kernel of each convolution or dense layer, the convolutions as a matrix over their patches.
+    - biases (dict): The bias of each convolution or dense layer.
+    - shapes (dict): The kernel shape of each convolution.
+
+    Methods:
+    - __init__(self, layers, arrays): Initialize the model.
+    - load(path): Load an export.
+    - predict_on_batch(self, x): Predict the outputs of a batch.
+    - convolve(self, x, index): Apply a convolution with a stride of 1.
+    - pool(x, size): Apply a max pooling with the pool size as the stride.
+    '''
+
+    def __init__(self, layers, arrays):
+        '''
+        Initialize the model.
+
+        Args:
+            layers (list): The layers, each a dictionary with its type and parameters.
+            arrays (dict): The kernel and the bias of each convolution or dense layer, by layer index.
+
+        Returns:
+            NumpyModel: The model.
+        '''
+        self.layers = layers
+        self.kernels, self.biases, self.shapes = {}, {}, {}
+        for index, layer in enumerate(layers):
+            if layer['type'] in ('conv', 'dense'):
+                kernel = numpy.asarray(arrays[f'kernel_{index}'], dtype=numpy.float32)
+                if layer['type'] == 'conv':
+                    # Order the kernel as the patches, channels first then rows then columns
+                    self.shapes[index] = kernel.shape
+                    kernel = kernel.transpose(2, 0, 1, 3).reshape(-1, kernel.shape[3])
+                self.kernels[index] = numpy.ascontiguousarray(kernel)
+                self.biases[index] = numpy.asarray(arrays[f'bias_{index}'], dtype=numpy.float32)
+
+    @staticmethod
+    def load(path=NPZ_PATH):
+        '''
+        Load an export.
+
+        Args:
+            path (str): The .npz path.
+
+        Returns:
+            NumpyModel: The model.
+        '''
+        with numpy.load(path) as data:
+            return NumpyModel(json.loads(str(data['layers'])), {key: data[key] for key in data.files if key != 'layers'})
+
+    def predict_on_batch(self, x):
+        '''
+        Predict the outputs of a batch.
+
+        Args:
+            x (numpy.ndarray): The inputs of shape (N, 9, 7, 1).
+
+        Returns:
+            numpy.ndarray: The outputs of shape (N, 1).
+        '''
+        x = numpy.asarray(x, dtype=numpy.float32)
+        for index, layer in enumerate(self.layers):
+            kind = layer['type']
+            if kind == 'conv':
+                x = self.convolve(x, index)
+            elif kind == 'dense':
+                x = x @ self.kernels[index] + self.biases[index]
+            elif kind == 'activation':
+                x = ACTIVATIONS[layer['name']](x, layer.get('alpha'))
+            elif kind == 'pool':
+                x = NumpyModel.pool(x, layer['size'])
+            elif kind == 'flatten':
+                x = x.reshape(len(x), -1)
+        return x
+
+    def convolve(self, x, index):
+        '''
+        Apply a convolution with a stride of 1 as a single matrix product over the patches.
+
+        Args:
+            x (numpy.ndarray): The inputs of shape (N, H, W, C).
+            index (int): The layer index.
+
+        Returns:
+            numpy.ndarray: The outputs.
+        '''
+        # Pad like Keras, the extra row and column go after
+        rows, columns = self.shapes[index][:2]
+        if self.layers[index]['padding'] == 'same':
+            x = numpy.pad(x, ((0, 0), ((rows - 1) // 2, rows // 2), ((columns - 1) // 2, columns // 2), (0, 0)))
+
+        # Multiply the patches of shape (N, H, W, C, rows, columns) by the kernel
+        patches = sliding_window_view(x, (rows, columns), axis=(1, 2))
+        n, h, w = patches.shape[:3]
+        return (patches.reshape(n * h * w, -1) @ self.kernels[index] + self.biases[index]).reshape(n, h, w, -1)
+
+    @staticmethod
+    def pool(x, size):
+        '''
+        Apply a max pooling with the pool size as the stride, dropping the rows and columns left over.
+
+        Args:
+            x (numpy.ndarray): The inputs of shape (N, H, W, C).
+            size (list): The pool size.
+
+        Returns:
+            numpy.ndarray: The outputs.
+        '''
+        n, h, w, c = x.shape
+        h, w = h // size[0], w // size[1]
+        return x[:, :h * size[0], :w * size[1]].reshape(n, h, size[0], w, size[1], c).max(axis=(2, 4))
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Export the value network for the NumPy forward pass and compare the backends.')
+    parser.add_argument('command', choices=('export', 'check', 'benchmark'), help='export the weights, compare the predictions or compare the latency and the memory')
+    parser.add_argument('-m', '--model', default=MODEL_PATH, help='the Keras model path')
+    parser.add_argument('-o', '--output', default=NPZ_PATH, help='the .npz path')
+    parser.add_argument('-b', '--batch-sizes', type=int, nargs='+', default=[1, 32, 256], help='the batch sizes of the benchmark')
+    args = parser.parse_args()
+
+    # Run the command
+    if args.command == 'export':
+        print(f'{len(Network.export(args.model, args.output))} layers written to {args.output}')
+    elif args.command == 'check':
+        difference = Network.check(args.model, args.output)
+        print(f'largest relative difference {difference:.6g}')
+        sys.exit(0 if difference < 1e-3 else 1)
+    else:
+        print(json.dumps(Network.benchmark((args.model, args.output), args.batch_sizes), indent=2))
@@ -0,0 +1,190 @@
+import argparse
+import sys
+import time
+import scripts.bitboard as bitboard
+import scripts.pieces.rat as rat
+import scripts.pieces.cat as cat
+import scripts.pieces.dog as dog
+import scripts.pieces.wolf as wolf
+import scripts.pieces.leopard as leopard
+import scripts.pieces.tiger as tiger
+import scripts.pieces.lion as lion
+import scripts.pieces.elephant as elephant
+from scripts.board import *
+
+# The piece class of each symbol, lower case for the dark side and upper case for the light side as in the logs
+PIECE_CLASSES = {'r': rat.Rat, 'c': cat.Cat, 'd': dog.Dog, 'w': wolf.Wolf, 'p': leopard.Leopard, 't': tiger.Tiger, 'l': lion.Lion, 'e': elephant.Elephant}
+
+# The reference positions: the pieces in the order of the cells, the side to move, the moves played from there
+# and the expected number of leaf nodes at each depth from 1
+PERFT_SUITE = {
+    'start': (
+        'l-r---E-T-d-----C---p---W-------------w---P---c-----D-t-e---R-L', PlayerSide.LIGHT, '',
+        (24, 576, 12_264, 261_120, 5_159_457),
+    ),
+    'river': (
+        '------EC----r-----ld------W-----T----wp---P----t--R----ce---D-L', PlayerSide.DARK, '',
+        (17, 374, 6_736, 144_269, 2_690_014),
+    ),
+    'endgame': (
+        '--E-----w--e-------------W----------------------D------------P-', PlayerSide.LIGHT, '',
+        (14, 67, 885, 4_818, 62_080),
+    ),
+    'forbidden': (
+        'l-r---E-T-d-----C---p---W-------------w---P---c-----D-t-e---R-L', PlayerSide.LIGHT, 'A7A6 A3A4 A6A7 A4A3 A7A6 A3A4 A6A7 A4A3 A7A6 A3A4 A6A7 A4A3',
+        (23, 529, 11_224, 237_655, 4_682_481),
+    ),
+}
+
+class Perft:
+    '''
+    The move generation benchmark and validation suite.
+
+    Counts the leaf nodes of the move tree to a fixed depth with make_move and undo_move. A finished game is a leaf.
+
+    Methods:
+    - setup(pieces, moves): Set up a board.
+    - decode(move): Decode a move written as in the logs.
+    - piece_moves(board, side): Get the valid moves from the available cells of the pieces.
+    - perft(board, side, depth, get_moves): Count the leaf nodes to a depth.
+    - run(depth, generator, names): Run the suite and check the counts.
+    '''
+
+    @staticmethod
+    def setup(pieces, moves=''):
+        '''
+        Set up a board.
+
+        Args:
+            pieces (str): The piece symbol of each cell in the order of the cells, '-' for an empty cell.
+            moves (str): The moves to play from there, separated by spaces.
+
+        Returns:
+            Board: The board.
+        '''
+        # Place the pieces
+        board = Board(False, True)
+        for (x, y), symbol in zip(bitboard.POSITIONS, pieces):
+            if symbol != '-':
+                board.get_cell((x, y)).add_piece(PIECE_CLASSES[symbol.lower()](PlayerSide.DARK if symbol.islower() else PlayerSide.LIGHT, True))
+        board.update_pieces()
+        board.bitboard = bitboard.Bitboard(board)
+
+        # Play the moves
+        for move in moves.split():
+            board.make_move(Perft.decode(move))
+
+        # Return the board
+        return board
+
+    @staticmethod
+    def decode(move):
+        '''
+        Decode a move written as in the logs.
+
+        Args:
+            move (str): The move, such as A7A6.
+
+        Returns:
+            tuple: The move.
+        '''
+        return ((ord(move[0]) - ord('A'), int(move[1]) - 1), (ord(move[2]) - ord('A'), int(move[3]) - 1))
+
+    @staticmethod
+    def piece_moves(board, side):
+        '''
+        Get the valid moves from the available cells of the pieces.
+
+        Args:
+            board (Board): The board.
+            side (PlayerSide): The side to move.
+
+        Returns:
+            list: The valid moves.
+        '''
+        return [(piece.position, cell.position) for piece in board.pieces_of[side] for cell in piece.available_cells(board) if (piece.position, cell.position) != board.forbidden_move]
+
+    @staticmethod
+    def perft(board, side, depth, get_moves=None):
+        '''
+        Count the leaf nodes to a depth.
+
+        Args:
+            board (Board): The board or the bitboard.
+            side (PlayerSide): The side to move.
+            depth (int): The depth.
+            get_moves (function): The move generator, None for the generator of the board.
+
+        Returns:
+            int: The number of leaf nodes.
+        '''
+        # Count the leaf
+        if depth == 0:
+            return 1
+
+        # Stop at the end of the game
+        if board.is_game_over:
+            return 0
+
+        # Count the moves of the last level without making them
+        moves = get_moves(board, side) if get_moves else board.get_valid_moves(side)
+        if depth == 1:
+            return len(moves)
+
+        # Count the leaf nodes of each move
+        nodes = 0
+        opponent_side = PlayerSide.opponent_of(side)
+        for move in moves:
+            board.make_move(move)
+            nodes += Perft.perft(board, opponent_side, depth - 1, get_moves)
+            board.undo_move(move)
+
+        # Return the number of leaf nodes
+        return nodes
+
+    @staticmethod
+    def run(depth=3, generator='bitboard', names=None):
+        '''
+        Run the suite, print the nodes per second and check the counts.
+
+        Args:
+            depth (int): The maximum depth.
+            generator (str): The move generator: bitboard, board or pieces.
+            names (list): The names of the positions, None for every position.
+
+        Returns:
+            bool: True if every count matches, False otherwise.
+        '''
+        # Initialize the result
+        result = True
+
+        # Iterate through the positions
+        for name in names or PERFT_SUITE:
+            pieces, side, moves, expected = PERFT_SUITE[name]
+            board = Perft.setup(pieces, moves)
+            board = board.bitboard if generator == 'bitboard' else board
+
+            # Count and time each depth
+            for current_depth in range(1, min(depth, len(expected)) + 1):
+                start = time.perf_counter()
+                nodes = Perft.perft(board, side, current_depth, Perft.piece_moves if generator == 'pieces' else None)
+                elapsed = time.perf_counter() - start
+
+                # Check the count
+                ok = nodes == expected[current_depth - 1]
+                result &= ok
+                print(f'{name:<10} depth {current_depth}  nodes {nodes:>9}  expected {expected[current_depth - 1]:>9}  {"ok  " if ok else "FAIL"}  {elapsed:8.3f}s  {nodes / max(elapsed, 1e-9):>12,.0f} nodes/s')
+
+        # Return the result
+        return result
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Count the leaf nodes of the reference positions and check them.')
+    parser.add_argument('-d', '--depth', type=int, default=3, help='the maximum depth')
+    parser.add_argument('-g', '--generator', choices=('bitboard', 'board', 'pieces'), default='bitboard', help='the move generator')
+    parser.add_argument('positions', nargs='*', help=f'the reference positions among {", ".join(PERFT_SUITE)}, every position by default')
+    args = parser.parse_args()
+
+    # Run the suite
+    sys.exit(0 if Perft.run(args.depth, args.generator, args.positions) else 1)
@@ -1,6 +1,5 @@
-import scripts.common as common
-from pygame import *
 from scripts.common import *
+from scripts.geometry import *
 
 class Piece:
     '''
@@ -8,8 +7,8 @@ class Piece:
     
     Attributes:
     - name (str): The name.
-    - image (Surface): The image.
-    - artwork (Surface): The artwork.
+    - image (str): The image path, loaded by the rendering layer.
+    - artwork (str): The artwork path, loaded by the rendering layer.
     - detail (str): The detail.
     - position (tuple): The position.
     - atk (int): The attack power.
@@ -17,10 +16,6 @@ class Piece:
     
     Methods:
     - copy(self): Copy the piece.
-    - left(self, step, board): Get the cell to the left.
-    - right(self, step, board): Get the cell to the right.
-    - up(self, step, board): Get the cell above.
-    - down(self, step, board): Get the cell below.
     - can_defeat(self, piece): Check if the piece can defeat another piece.
     - is_valid_cell(self, cell): Check if the cell is a valid move.
     - available_cells(self, board): Get the available cells.
@@ -46,8 +41,8 @@ class Piece:
             Piece: The new instance of the Piece class.
         '''
         self.name = name
-        self.image = image_path and transform.scale(image.load(image_path), Size.CELL) or None
-        self.artwork = artwork_path and transform.scale(image.load(artwork_path), Size.ARTWORK) or None
+        self.image = image_path
+        self.artwork = artwork_path
         self.detail = detail
         self.position = position
         self.atk = atk
@@ -62,58 +57,6 @@ class Piece:
         '''
         return Piece(self.name, self.detail, self.position, self.atk, self.side)
 
-    def left(self, step, board):
-        '''
-        Returns the cell to the left of the piece.
-        
-        Args:
-            step (int): The step size.
-            board (Board): The board.
-            
-        Returns:
-            Cell: The cell to the left of the piece.
-        '''
-        return None if self.position[0] - step < 0 else board.get_cell((self.position[0] - step, self.position[1]))
-    
-    def right(self, step, board):
-        '''
-        Returns the cell to the right of the piece.
-        
-        Args:
-            step (int): The step size.
-            board (Board): The board.
-            
-        Returns:
-            Cell: The cell to the right of the piece.
-        '''
-        return None if self.position[0] + step >= common.W else board.get_cell((self.position[0] + step, self.position[1]))
-    
-    def up(self, step, board):
-        '''
-        Returns the cell above the piece.
-        
-        Args:
-            step (int): The step size.
-            board (Board): The board.
-        
-        Returns:
-            Cell: The cell above the piece.
-        '''
-        return None if self.position[1] - step < 0 else board.get_cell((self.position[0], self.position[1] - step))
-    
-    def down(self, step, board):
-        '''
-        Returns the cell below the piece.
-        
-        Args:
-            step (int): The step size.
-            board (Board): The board.
-            
-        Returns:
-            Cell: The cell below the piece.
-        '''
-        return None if self.position[1] + step >= common.H else board.get_cell((self.position[0], self.position[1] + step))
-    
     def can_defeat(self, piece):
         '''
         Checks if the piece can defeat another piece.
@@ -148,8 +91,8 @@ class Piece:
         Returns:
             list: A list of available cells for the piece.
         '''
-        # Get the available cells
-        result = [cell for direction in [self.left, self.right, self.up, self.down] if (cell := direction(1, board)) and self.is_valid_cell(cell)]
+        # Get the available cells from the precomputed neighbours
+        result = [cell for position in NEIGHBOURS[self.position] if position and self.is_valid_cell(cell := board.get_cell(position))]
 
         # Check if the piece is a rat
         if board.forbidden_move and board.forbidden_move[0] == self.position and board.forbidden_cell in result:
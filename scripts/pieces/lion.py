@@ -1,4 +1,5 @@
 from scripts.common import *
+from scripts.geometry import *
 from scripts.piece import *
 
 class Lion(Piece):
@@ -48,7 +49,7 @@ class Lion(Piece):
             list: A list of available cells for the lion.
         '''
         # Initialize the result
-        result = [cell for direction in [self.left, self.right, self.up, self.down] if (cell := Lion.jump_over_river(direction(1, board), direction, board) or direction(1, board)) and self.is_valid_cell(cell)]
+        result = [cell for direction, position in enumerate(NEIGHBOURS[self.position]) if position and (cell := Lion.jump_over_river(self.position, direction, board)) and self.is_valid_cell(cell)]
 
         # Remove the forbidden cell if the forbidden move is the same as the lion's position
         if board.forbidden_move and board.forbidden_move[0] == self.position and board.forbidden_cell in result:
@@ -58,36 +59,22 @@ class Lion(Piece):
         return result
 
     @staticmethod
-    def jump_over_river(cell, direction, board):
+    def jump_over_river(position, direction, board):
         '''
         Jumps over the river.
         
         Args:
-            cell (Cell): The cell.
-            direction (function): The direction function.
+            position (tuple): The position to jump from.
+            direction (int): The direction index.
             board (Board): The board.
         
         Returns:
-            Cell: The cell.
+            Cell: The landing cell, the neighbour cell if there is no river to jump, or None if the river is blocked.
         '''
-        # Return None if the cell is invalid
-        if not cell:
-            return cell
-        
-        # Initialize the step
-        step = 1
-
-        # Jump over the river
-        while cell.is_river:
-            # Get the next cell
-            cell = direction(step, board)
-
-            # Return None if the cell is invalid
-            if cell and cell.piece:
-                return cell.is_river and None or cell
-            
-            # Increment the step
-            step += 1
+        # Return the neighbour cell if there is no river to jump
+        if not (jump := JUMPS[position][direction]):
+            return board.get_cell(NEIGHBOURS[position][direction])
 
-        # Return the cell
-        return cell
+        # Return None if a piece swims in the river, otherwise the landing cell
+        landing, rivers = jump
+        return None if any(board.get_cell(river).piece for river in rivers) else board.get_cell(landing)
@@ -0,0 +1,281 @@
+import argparse
+import csv
+import itertools
+import os
+import numpy
+import scripts.bitboard as bitboard
+from scripts.board import *
+from scripts.log import *
+
+RECORDS_MAGIC = b'ACGAMES1'
+RECORDS_HEADER = numpy.dtype([('magic', 'S8'), ('scores', 'u1')])
+GAME_HEADER = numpy.dtype([('id', 'S36'), ('moves', '<u2'), ('winner', 'i1')])
+MOVE_RECORD = numpy.dtype([('move', '<u2')])
+SCORED_MOVE_RECORD = numpy.dtype([('move', '<u2'), ('score', '<i2')])
+
+# The stored score of a move logged without a score, rebuilt as an empty score
+MISSING_SCORE = numpy.iinfo(numpy.int16).min
+
+# The symbol of each piece code as in the logged boards, and the logged labels of each square
+SYMBOLS = (b'-' + b'rcdwptle' + b'RCDWPTLE').ljust(256, b'-')
+RIVER_ENUMS = [1 if CellLabel.is_river(bitboard.LABELS[position]) else 0 for position in bitboard.POSITIONS]
+TRAP_ENUMS = [-1 if CellLabel.is_light_trap(bitboard.LABELS[position]) else 1 if CellLabel.is_dark_trap(bitboard.LABELS[position]) else 0 for position in bitboard.POSITIONS]
+DEN_ENUMS = [-1 if CellLabel.is_light_den(bitboard.LABELS[position]) else 1 if CellLabel.is_dark_den(bitboard.LABELS[position]) else 0 for position in bitboard.POSITIONS]
+
+class GameRecords:
+    '''
+    The compact binary game records.
+
+    A game is fully determined by its moves, so a file holds a header, then for each game its ID, its number of moves
+    and its winner followed by one fixed-width record per move: the move code and optionally the logged score.
+    Every row of the CSV logs is rebuilt on demand by replaying the moves on a bitboard.
+
+    The scores are stored as 16-bit integers, a missing score as MISSING_SCORE. Logs with fractional scores,
+    such as the scores of the value network, only fit without their scores.
+
+    Each game is a tuple of the ID, the winner enum, the move codes and the scores, None if the file has no scores.
+    The scores of the games read from the CSV logs are None for the moves logged without a score.
+
+    Methods:
+    - write(path, games, scores): Write games to a file.
+    - pack_scores(game_id, scores): Pack the scores of a game as they are stored.
+    - read(path): Stream the games of a file.
+    - replay(game): Rebuild the CSV rows of a game.
+    - row(game, ply): Rebuild a single CSV row of a game.
+    - read_csv(paths): Stream the games of CSV logs.
+    - from_csv(paths, path, scores): Convert CSV logs to a file.
+    - to_csv(path, csv_path): Convert a file to a CSV log.
+    '''
+
+    @staticmethod
+    def write(path, games, scores=True):
+        '''
+        Write games to a file.
+
+        Args:
+            path (str): The path of the file.
+            games (iterable): The games.
+            scores (bool): True to keep the score of each move, False to recompute them when the rows are rebuilt.
+
+        Returns:
+            tuple: The number of games and the number of moves written.
+
+        Raises:
+            ValueError: If the ID of a game does not fit in its header, or if a score is fractional or out of range.
+        '''
+        # Write the header
+        record = SCORED_MOVE_RECORD if scores else MOVE_RECORD
+        count, moves = 0, 0
+        try:
+            with open(f'{path}.part', 'wb') as file:
+                numpy.array([(RECORDS_MAGIC, scores)], dtype=RECORDS_HEADER).tofile(file)
+
+                # Write each game followed by its moves
+                for game_id, winner, game_moves, game_scores in games:
+                    if len(game_id.encode('ascii')) > GAME_HEADER['id'].itemsize:
+                        raise ValueError(f'The ID {game_id} is longer than {GAME_HEADER["id"].itemsize} characters')
+                    numpy.array([(game_id.encode('ascii'), len(game_moves), winner)], dtype=GAME_HEADER).tofile(file)
+                    records = numpy.zeros(len(game_moves), dtype=record)
+                    records['move'] = game_moves
+                    if scores:
+                        records['score'] = GameRecords.pack_scores(game_id, game_scores)
+                    records.tofile(file)
+                    count, moves = count + 1, moves + len(game_moves)
+        except BaseException:
+            os.remove(f'{path}.part')
+            raise
+        os.replace(f'{path}.part', path)
+
+        # Return the counts
+        return count, moves
+
+    @staticmethod
+    def pack_scores(game_id, scores):
+        '''
+        Pack the scores of a game as they are stored.
+
+        Args:
+            game_id (str): The ID of the game.
+            scores (list): The score of each move, None for a missing score.
+
+        Returns:
+            numpy.ndarray: The stored scores.
+
+        Raises:
+            ValueError: If a score is fractional or out of range, the scores would not be rebuilt as they were logged.
+        '''
+        # Check that the scores are integers within the range of the stored scores
+        values = numpy.array([MISSING_SCORE if score is None else score for score in scores], dtype=numpy.float64)
+        logged = numpy.array([score is not None for score in scores], dtype=bool)
+        limit = numpy.iinfo(numpy.int16).max
+        if len(values) and (not numpy.all(values[logged] == numpy.round(values[logged])) or numpy.any(numpy.abs(values[logged]) > limit)):
+            raise ValueError(f'the scores of the game {game_id} are not integers between {-limit} and {limit}, convert the logs without their scores')
+
+        # Return the stored scores
+        return values.astype(numpy.int16)
+
+    @staticmethod
+    def read(path):
+        '''
+        Stream the games of a file.
+
+        Args:
+            path (str): The path of the file.
+
+        Yields:
+            tuple: A game.
+
+        Raises:
+            ValueError: If the file is not a game records file.
+        '''
+        with open(path, 'rb') as file:
+            # Check the header
+            header = numpy.fromfile(file, dtype=RECORDS_HEADER, count=1)
+            if not len(header) or header[0]['magic'] != RECORDS_MAGIC:
+                raise ValueError(f'{path} is not a game records file')
+            scores = bool(header[0]['scores'])
+            record = SCORED_MOVE_RECORD if scores else MOVE_RECORD
+
+            # Read each game and its moves
+            while len(game := numpy.fromfile(file, dtype=GAME_HEADER, count=1)):
+                records = numpy.fromfile(file, dtype=record, count=int(game[0]['moves']))
+                yield game[0]['id'].decode('ascii'), int(game[0]['winner']), records['move'], records['score'] if scores else None
+
+    @staticmethod
+    def replay(game):
+        '''
+        Rebuild the CSV rows of a game, as Log.insert_chess_record wrote them.
+
+        Args:
+            game (tuple): The game.
+
+        Yields:
+            tuple: The row of each move in the order of the columns.
+        '''
+        game_id, _, moves, scores = game
+        board = Board(is_copy=True).bitboard
+        for ply, packed in enumerate(moves):
+            # Make the move
+            move = bitboard.MOVES[int(packed)]
+            board.make_move(move)
+            target = int(packed) & 63
+            code = board.mailbox[target]
+
+            # Rebuild the row
+            yield (
+                game_id,
+                board.mailbox.translate(SYMBOLS).decode('ascii'),
+                1 if bitboard.SIDE_OF_CODE[code] == bitboard.SIDE_INDEX[PlayerSide.DARK] else -1,
+                chr(SYMBOLS[code]),
+                0 if bitboard.BITS[target] & bitboard.OPPONENT_TRAPS[bitboard.SIDE_OF_CODE[code]] else bitboard.KIND_OF_CODE[code],
+                Log.move_to_enum(move),
+                RIVER_ENUMS[target],
+                TRAP_ENUMS[target],
+                DEN_ENUMS[target],
+                Bot.evaluate_position(board, PlayerSide.DARK) if scores is None else '' if scores[ply] == MISSING_SCORE else int(scores[ply]),
+                Log.side_to_enum(board.winner),
+            )
+
+    @staticmethod
+    def row(game, ply):
+        '''
+        Rebuild a single CSV row of a game.
+
+        Args:
+            game (tuple): The game.
+            ply (int): The index of the move.
+
+        Returns:
+            tuple: The row of the move in the order of the columns.
+        '''
+        return next(itertools.islice(GameRecords.replay(game), ply, None))
+
+    @staticmethod
+    def read_csv(paths):
+        '''
+        Stream the games of CSV logs, one row at a time.
+
+        Args:
+            paths (list): The CSV paths of the logs.
+
+        Yields:
+            tuple: A game.
+        '''
+        for path in paths:
+            with open(path, newline='') as file:
+                # Group the consecutive rows of each game, the winner is recorded on the last move
+                game_id, moves, scores, winner = None, [], [], 0
+                for row in csv.DictReader(file):
+                    if row['id'] != game_id or winner:
+                        if moves:
+                            yield game_id, winner, moves, scores
+                        game_id, moves, scores = row['id'], [], []
+                    source, target = Log.enum_to_move(row['move'])
+                    moves.append(bitboard.SQUARE_OF[source] << 6 | bitboard.SQUARE_OF[target])
+                    scores.append(float(row['score']) if row['score'] else None)
+                    winner = int(float(row['winner'] or 0))
+
+                # Yield the last game
+                if moves:
+                    yield game_id, winner, moves, scores
+
+    @staticmethod
+    def from_csv(paths, path, scores=True):
+        '''
+        Convert CSV logs to a file.
+
+        Args:
+            paths (list): The CSV paths of the logs.
+            path (str): The path of the file.
+            scores (bool): True to keep the logged scores, False to recompute them when the rows are rebuilt.
+
+        Returns:
+            tuple: The number of games and the number of moves written.
+        '''
+        return GameRecords.write(path, GameRecords.read_csv(paths), scores)
+
+    @staticmethod
+    def to_csv(path, csv_path):
+        '''
+        Convert a file to a CSV log with the columns of the logs.
+
+        Args:
+            path (str): The path of the file.
+            csv_path (str): The CSV path.
+
+        Returns:
+            int: The number of rows written.
+        '''
+        rows = 0
+        with open(f'{csv_path}.part', 'w', newline='') as file:
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(COLUMNS)
+            for game in GameRecords.read(path):
+                for row in GameRecords.replay(game):
+                    writer.writerow(row)
+                    rows += 1
+        os.replace(f'{csv_path}.part', csv_path)
+        return rows
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Convert the game logs between CSV and the compact binary game records.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    to_binary = subparsers.add_parser('to-binary', help='convert CSV logs to a game records file')
+    to_binary.add_argument('paths', nargs='+', help='the CSV logs')
+    to_binary.add_argument('-o', '--output', required=True, help='the game records path')
+    to_binary.add_argument('--no-scores', action='store_true', help='drop the logged scores, they are recomputed when the rows are rebuilt')
+    to_csv = subparsers.add_parser('to-csv', help='convert a game records file to a CSV log')
+    to_csv.add_argument('path', help='the game records path')
+    to_csv.add_argument('-o', '--output', required=True, help='the CSV path')
+    args = parser.parse_args()
+
+    # Run the conversion
+    if args.command == 'to-binary':
+        try:
+            games, moves = GameRecords.from_csv(args.paths, args.output, not args.no_scores)
+        except ValueError as error:
+            parser.error(str(error))
+        print(f'{games} games and {moves} moves written to {args.output}')
+    else:
+        print(f'{GameRecords.to_csv(args.path, args.output)} rows written to {args.output}')
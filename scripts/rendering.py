@@ -2,12 +2,16 @@ import math as m
 import pygame
 import scripts.common as common
 from pygame import *
+from scripts.assets import *
 from scripts.common import *
 
-COVER_SCALED = transform.scale(image.load(ImagePath.COVER), Size.BOARD)
-START_BTN_SCALED = transform.scale(image.load(ImagePath.START_BTN), Size.START_BTN)
-GUIDE_SCALED = transform.scale(image.load(ImagePath.GUIDE), Size.SUBSCREEN)
-CARD_SCALED = transform.scale(image.load(ImagePath.CARD), Size.SUBSCREEN)
+# Decode and scale every asset once
+Assets.preload()
+
+COVER_SCALED = Assets.get(ImagePath.COVER, Size.BOARD)
+START_BTN_SCALED = Assets.get(ImagePath.START_BTN, Size.START_BTN)
+GUIDE_SCALED = Assets.get(ImagePath.GUIDE, Size.SUBSCREEN)
+CARD_SCALED = Assets.get(ImagePath.CARD, Size.SUBSCREEN)
 
 START_BTN_RECT = Rect((Size.BOARD[0] - Size.START_BTN[0]) / 2, Size.BOARD[1] - Size.START_BTN[1] - 25, Size.START_BTN[0], Size.START_BTN[1])
 
@@ -100,7 +104,7 @@ def draw_game(screen, game_manager):
 
             # Draw the cell image if it exists
             if cell.image:
-                screen.blit(cell.image, (x, y))
+                screen.blit(Assets.get(cell.image, Size.CELL), (x, y))
             
             # Draw the cell border
             draw.rect(screen, Color.GREY, cell_rect, 1)
@@ -112,10 +116,7 @@ def draw_game(screen, game_manager):
                 draw_star(screen, Color.star_color(cell.piece.side), (x + X_PADDING_STAR, y + X_PADDING_STAR), 40, 20, OPACITY, 20)
 
                 # Flip the piece image horizontally if cell.position > 3
-                if cell.position[0] > 3:
-                    screen.blit(transform.flip(cell.piece.image, True, False), (x, y))
-                else:
-                    screen.blit(cell.piece.image, (x, y))
+                screen.blit(Assets.get(cell.piece.image, Size.CELL, cell.position[0] > 3), (x, y))
     
     # Highlight the available cells for the selected piece
     if game_manager.selected_piece:
@@ -163,7 +164,7 @@ def draw_subscreen(screen, game_manager):
     '''
     # Create a subscreen surface and fill it with a grey color
     SUBSCREEN_SURFACE.blit(CARD_SCALED, (0, 0))
-    SUBSCREEN_SURFACE.blit(transform.scale(game_manager.focused_piece.artwork, Size.ARTWORK), (Size.PADDING[0], Y_ARTWORK))
+    SUBSCREEN_SURFACE.blit(Assets.get(game_manager.focused_piece.artwork, Size.ARTWORK), (Size.PADDING[0], Y_ARTWORK))
     y_position = Y_DESCRIPTION
     
     # Wrap the description text and render it on the subscreen
@@ -0,0 +1,201 @@
+import argparse
+import csv
+import os
+import numpy
+import scripts.bitboard as bitboard
+from scripts.bot import *
+from scripts.evaluation import *
+from scripts.network import *
+from scripts.shards import *
+
+# The index of the columns read and filled by the scoring
+BOARD_COLUMN, SIDE_COLUMN, SCORE_COLUMN = 1, 2, 9
+
+class Scoring:
+    '''
+    The deferred scoring of the logged positions, a whole game or shard in one sweep.
+
+    The score of a row is the score for the dark side of the position after its move, as Log.insert_chess_record gives it.
+    A scorer maps the logged boards and the sides that made the moves to their scores, the static evaluators scoring
+    every board with a single vectorized call, the searches one board at a time and the value network in one prediction.
+
+    Methods:
+    - scorer(evaluator, depth, model_path): Get the scorer of the logged positions.
+    - static_scorer(evaluator): Get the scorer of a static evaluator.
+    - search_scorer(depth, evaluator): Get the scorer of the iterative deepening search.
+    - network_scorer(model_path): Get the scorer of the value network.
+    - to_bitboard(codes, side): Place the pieces of a position on a bitboard.
+    - score_rows(rows, scorer, missing_only): Fill the scores of rows in place.
+    - score_file(path, scorer, missing_only, chunk_size): Fill the scores of a CSV log.
+    '''
+
+    @staticmethod
+    def scorer(evaluator=Evaluator.MATERIAL, depth=0, model_path=None):
+        '''
+        Get the scorer of the logged positions.
+
+        Args:
+            evaluator (Evaluator): The evaluator, the material one gives the scores of the logs.
+            depth (int): The depth of the search, 0 to evaluate the positions directly.
+            model_path (str): The path of the AI model, None to score without it.
+
+        Returns:
+            function: The scorer, mapping the logged boards and the side enums of their moves to the scores.
+        '''
+        if model_path:
+            return Scoring.network_scorer(model_path)
+        return Scoring.search_scorer(depth, evaluator) if depth else Scoring.static_scorer(evaluator)
+
+    @staticmethod
+    def static_scorer(evaluator=Evaluator.MATERIAL):
+        '''
+        Get the scorer of a static evaluator, scoring all the positions with a single vectorized call.
+
+        Args:
+            evaluator (Evaluator): The evaluator.
+
+        Returns:
+            function: The scorer.
+        '''
+        return lambda boards, _: Evaluation.evaluate_batch(Evaluation.decode_boards(boards), PlayerSide.DARK, evaluator)
+
+    @staticmethod
+    def search_scorer(depth, evaluator=Evaluator.MATERIAL):
+        '''
+        Get the scorer of the iterative deepening search, the positions sharing a transposition table.
+
+        The move history of the games is not logged, so the forbidden moves are not known to the search.
+
+        Args:
+            depth (int): The depth of the search.
+            evaluator (Evaluator): The evaluator at the horizon.
+
+        Returns:
+            function: The scorer.
+        '''
+        table = TranspositionTable()
+
+        def score(boards, sides):
+            # Search each position for the side to move, the other side of the logged move
+            scores = []
+            for codes, side in zip(Evaluation.decode_boards(boards), sides):
+                side_to_move = PlayerSide.LIGHT if int(side) == 1 else PlayerSide.DARK
+                board = Scoring.to_bitboard(codes, side_to_move)
+                eval, _ = Bot.iterative_deepening(board, side_to_move, depth, SearchContext(table, evaluator=evaluator))
+
+                # Keep the score for the dark side
+                scores.append(eval if side_to_move == PlayerSide.DARK else -eval)
+
+            # Return the scores
+            return numpy.array(scores)
+
+        return score
+
+    @staticmethod
+    def network_scorer(model_path=MODEL_PATH):
+        '''
+        Get the scorer of the value network, scoring all the positions with a single prediction.
+
+        Args:
+            model_path (str): The path of the AI model, loaded once per process.
+
+        Returns:
+            function: The scorer.
+        '''
+        return lambda boards, _: Network.predict(Network.load(model_path), Evaluation.decode_boards(boards))
+
+    @staticmethod
+    def to_bitboard(codes, side):
+        '''
+        Place the pieces of a position on a bitboard.
+
+        Args:
+            codes (numpy.ndarray): The piece code on each square.
+            side (PlayerSide): The side to move.
+
+        Returns:
+            Bitboard: The bitboard without move history.
+        '''
+        board = bitboard.Bitboard()
+        for square in numpy.flatnonzero(codes):
+            board.place(int(codes[square]), int(square))
+        if side == PlayerSide.DARK:
+            board.hash ^= bitboard.ZOBRIST_SIDE
+        return board
+
+    @staticmethod
+    def score_rows(rows, scorer, missing_only=False):
+        '''
+        Fill the scores of rows in place, with a single call of the scorer.
+
+        Args:
+            rows (list): The rows, each a list in the order of the columns.
+            scorer (function): The scorer.
+            missing_only (bool): True to score the rows without a score only, False to score every row.
+
+        Returns:
+            int: The number of rows scored.
+        '''
+        # Select the rows to score
+        indices = [index for index, row in enumerate(rows) if not missing_only or row[SCORE_COLUMN] in (None, '')]
+        if not indices:
+            return 0
+
+        # Score them together
+        scores = scorer([rows[index][BOARD_COLUMN] for index in indices], [rows[index][SIDE_COLUMN] for index in indices])
+        for index, score in zip(indices, numpy.asarray(scores).reshape(-1).tolist()):
+            rows[index][SCORE_COLUMN] = score
+
+        # Return the number of rows scored
+        return len(indices)
+
+    @staticmethod
+    def score_file(path, scorer, missing_only=True, chunk_size=100_000):
+        '''
+        Fill the scores of a CSV log, streaming it a chunk of rows at a time and replacing it atomically.
+
+        A shard listed in the manifest is listed again with its new size.
+
+        Args:
+            path (str): The CSV path of the log.
+            scorer (function): The scorer.
+            missing_only (bool): True to score the rows without a score only, False to score every row.
+            chunk_size (int): The number of rows scored together.
+
+        Returns:
+            tuple: The number of rows and the number of rows scored.
+        '''
+        # Score each chunk and write it to a temporary file
+        rows, scored = 0, 0
+        with open(path, newline='') as source, open(f'{path}.part', 'w', newline='') as target:
+            reader, writer = csv.reader(source), csv.writer(target, lineterminator='\n')
+            writer.writerow(next(reader))
+            while chunk := [row for _, row in zip(range(chunk_size), reader)]:
+                scored += Scoring.score_rows(chunk, scorer, missing_only)
+                writer.writerows(chunk)
+                rows += len(chunk)
+
+        # Replace the log and list the shard again with its new size
+        os.replace(f'{path}.part', path)
+        if any(os.path.samefile(shard['path'], path) for shard in ShardWriter.read_manifest(os.path.dirname(path) or '.')):
+            ShardWriter.publish(path, rows)
+
+        # Return the counts
+        return rows, scored
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Fill the scores of the logged positions, a chunk of rows per batch.')
+    parser.add_argument('paths', nargs='+', help='the CSV logs, rewritten in place')
+    parser.add_argument('-e', '--evaluator', default=Evaluator.MATERIAL, choices=[Evaluator.MATERIAL, Evaluator.POSITIONAL], help='the evaluator, material by default as in the logs')
+    parser.add_argument('-d', '--depth', type=int, default=0, help='the depth of the search, 0 to evaluate the positions directly')
+    parser.add_argument('-m', '--model', help='the path of the AI model, scoring with the value network instead of the evaluator')
+    parser.add_argument('-c', '--chunk-size', type=int, default=100_000, help='the number of rows scored together')
+    parser.add_argument('--all', action='store_true', help='score every row again, not only the rows without a score')
+    args = parser.parse_args()
+
+    # Score each log
+    scorer = Scoring.scorer(args.evaluator, args.depth, args.model)
+    for path in args.paths:
+        rows, scored = Scoring.score_file(path, scorer, not args.all, args.chunk_size)
+        print(f'{path}: {scored} of {rows} rows scored')
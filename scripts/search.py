@@ -0,0 +1,115 @@
+import time
+from scripts.transposition import *
+
+class SearchAborted(Exception):
+    '''
+    Raised inside a search when its time or node budget runs out or it is cancelled.
+    '''
+
+class SearchContext:
+    '''
+    The state shared by the nodes of a search.
+
+    Attributes:
+    - table (TranspositionTable): The transposition table.
+    - start (float): The performance counter value when the context was created.
+    - deadline (float): The performance counter value at which the search stops, None for no time limit.
+    - node_limit (int): The number of nodes after which the search stops, None for no node limit.
+    - stop (Event): The event that cancels the search when it is set, None if it cannot be cancelled.
+    - quiescence_depth (int): The maximum depth of the quiescence search at the horizon, 0 to evaluate the horizon directly.
+    - evaluator (Evaluator): The evaluator of the positions.
+    - tablebase (Tablebase): The endgame tablebases probed by the search, None to search without them.
+    - nodes (int): The number of nodes visited.
+    - depth (int): The depth of the deepest completed iteration.
+    - pv (list): The principal variation of the deepest completed iteration.
+    - root_ply (int): The number of moves on the board at the root of the search.
+    - killers (dict): The quiet moves that caused a cutoff, the latest first, per ply.
+    - history (dict): The history heuristic counter of each quiet move.
+
+    Methods:
+    - __init__(self, table, time_limit, node_limit, stop, quiescence_depth, evaluator, tablebase): Initialize the context.
+    - visit(self): Count a node and abort the search when the budget runs out.
+    - add_cutoff(self, move, ply, depth): Record a quiet move that caused a cutoff.
+    - elapsed: Get the time spent since the context was created.
+    '''
+    CHECK_INTERVAL = 256
+    KILLERS = 2
+    QUIESCENCE_DEPTH = 6
+
+    def __init__(self, table=None, time_limit=None, node_limit=None, stop=None, quiescence_depth=QUIESCENCE_DEPTH, evaluator=Evaluator.MATERIAL, tablebase=None):
+        '''
+        Initialize the context.
+
+        Args:
+            table (TranspositionTable): The transposition table, None to create one.
+            time_limit (float): The time budget in seconds, None for no time limit.
+            node_limit (int): The node budget, None for no node limit.
+            stop (Event): The event that cancels the search when it is set, None if it cannot be cancelled.
+            quiescence_depth (int): The maximum depth of the quiescence search at the horizon, 0 to evaluate the horizon directly.
+            evaluator (Evaluator): The evaluator of the positions.
+            tablebase (Tablebase): The endgame tablebases probed by the search, None to search without them.
+
+        Returns:
+            SearchContext: The context.
+        '''
+        self.table = table or TranspositionTable()
+        self.start = time.perf_counter()
+        self.deadline = time_limit and self.start + time_limit
+        self.node_limit = node_limit
+        self.stop = stop
+        self.quiescence_depth = quiescence_depth
+        self.evaluator = evaluator
+        self.tablebase = tablebase
+        self.nodes = 0
+        self.depth = 0
+        self.pv = []
+        self.root_ply = 0
+        self.killers = {}
+        self.history = {}
+
+    def visit(self):
+        '''
+        Count a node and abort the search when the budget runs out.
+
+        Raises:
+            SearchAborted: If the time or node budget ran out or the search was cancelled.
+        '''
+        # Count the node
+        self.nodes += 1
+
+        # Check the node budget
+        if self.node_limit and self.nodes > self.node_limit:
+            raise SearchAborted()
+
+        # Check the clock and the stop event periodically
+        if self.nodes % SearchContext.CHECK_INTERVAL == 0:
+            if self.deadline and time.perf_counter() >= self.deadline or self.stop and self.stop.is_set():
+                raise SearchAborted()
+
+    def add_cutoff(self, move, ply, depth):
+        '''
+        Record a quiet move that caused a cutoff as a killer move and in the history heuristic.
+
+        Args:
+            move (tuple): The move.
+            ply (int): The ply of the move from the root.
+            depth (int): The remaining depth of the search at the move.
+        '''
+        # Keep the latest killer moves of the ply
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[SearchContext.KILLERS:]
+
+        # Reward the move, deeper cutoffs count more
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    @property
+    def elapsed(self):
+        '''
+        Get the time spent since the context was created.
+
+        Returns:
+            float: The elapsed time in seconds.
+        '''
+        return time.perf_counter() - self.start
@@ -0,0 +1,182 @@
+import argparse
+import functools
+import multiprocessing
+import random
+import sys
+import time
+from multiprocessing import util
+from scripts.manager import *
+
+# The engines of the computer, each taking the game manager and the settings of the run and giving the move of the side to move
+ENGINES = {
+    'search': lambda manager, _: manager.computer_move(),
+    'ai': lambda manager, _: manager.ai_move(),
+    'mcts': lambda manager, settings: manager.mcts_move(settings['simulations']),
+    'random': lambda manager, _: random.choice(manager.board.get_valid_moves(manager.current_side) or [None]),
+}
+
+# The game manager of the worker process, built once by the pool initializer
+_manager = None
+
+class SelfPlay:
+    '''
+    The headless self-play generator of the training data.
+
+    The games are fanned out over a pool of processes, each worker driving its own game manager without a display
+    and streaming its records to its own shards. A game only depends on the seed of the run and its index,
+    whichever worker plays it.
+
+    Methods:
+    - initialize(settings): Build the game manager of a worker.
+    - finish(manager): Finish the last shard of a worker.
+    - play(index, settings): Play a game in the worker.
+    - run(games, workers, settings, progress): Play the games over a pool of workers.
+    '''
+
+    @staticmethod
+    def initialize(settings):
+        '''
+        Build the game manager of a worker, its log writing to shards of its own.
+
+        Args:
+            settings (dict): The settings of the run.
+        '''
+        global _manager
+        writer = ShardWriter(COLUMNS, settings['directory'], settings['prefix'], settings['max_rows'])
+        scorer = Scoring.scorer(settings['evaluator'], settings['score_depth']) if settings['deferred'] and settings['score_depth'] else None
+        log = Log(writer, settings['deferred'], scorer)
+        _manager = GameManager(GameMode.CvC, settings['depth'], settings['time_limit'], settings['evaluator'], settings['book_path'], settings['tablebase_dir'], settings['model_path'], log=log, headless=True)
+
+        # Finish the last shard when the worker exits, the pool workers skip the exit handlers
+        util.Finalize(_manager, SelfPlay.finish, args=(_manager,), exitpriority=10)
+
+    @staticmethod
+    def finish(manager):
+        '''
+        Finish the last shard of a worker.
+
+        Args:
+            manager (GameManager): The game manager of the worker.
+        '''
+        manager.log.writer.close()
+
+    @staticmethod
+    def play(index, settings):
+        '''
+        Play a game in the worker, saving its records when it ends or reaches the move limit.
+
+        Args:
+            index (int): The index of the game.
+            settings (dict): The settings of the run.
+
+        Returns:
+            tuple: The number of moves, the winner enum, 0 for an unfinished game, and the time in seconds.
+        '''
+        # Seed the game and start from the initial position
+        random.seed(settings['seed'] * 1_000_003 + index)
+        start = time.perf_counter()
+        manager = _manager
+        manager.reset_game()
+        engines = {PlayerSide.DARK: ENGINES[settings['engine']], PlayerSide.LIGHT: ENGINES[settings['opponent'] or settings['engine']]}
+
+        # Play until the game ends or reaches the move limit
+        moves = 0
+        while moves < settings['max_moves']:
+            if not (move := engines[manager.current_side](manager, settings)):
+                break
+            manager.board.make_move(move)
+            manager.log.insert_chess_record(manager.board, move)
+            moves += 1
+            if manager.is_game_end:
+                break
+            manager.switch_player()
+
+        # Save the records of the game
+        manager.log.save()
+        return moves, Log.side_to_enum(manager.board.winner), time.perf_counter() - start
+
+    @staticmethod
+    def run(games, workers, settings, progress=100):
+        '''
+        Play the games over a pool of workers and print the throughput as they finish.
+
+        Args:
+            games (int): The number of games.
+            workers (int): The number of worker processes.
+            settings (dict): The settings of the run.
+            progress (int): The number of games between the progress lines, 0 for none.
+
+        Returns:
+            dict: The games, the moves, the results, the time and the throughput of the run.
+        '''
+        # Initialize the totals
+        start = time.perf_counter()
+        moves, results = 0, {1: 0, -1: 0, 0: 0}
+
+        # Fan the games out, the workers exit cleanly on closing so their last shards are finished
+        pool = multiprocessing.get_context('spawn').Pool(workers, SelfPlay.initialize, (settings,))
+        try:
+            for done, (game_moves, winner, _) in enumerate(pool.imap_unordered(functools.partial(SelfPlay.play, settings=settings), range(games)), 1):
+                moves += game_moves
+                results[winner] += 1
+                if progress and done % progress == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f'{done:>8} games  {done / elapsed:8.2f} games/s  {moves / elapsed:10.1f} moves/s', file=sys.stderr)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+        # Return the totals
+        elapsed = time.perf_counter() - start
+        return {'games': games, 'moves': moves, 'dark_wins': results[1], 'light_wins': results[-1], 'unfinished': results[0], 'seconds': round(elapsed, 3), 'games_per_second': round(games / max(elapsed, 1e-9), 3), 'moves_per_second': round(moves / max(elapsed, 1e-9), 1)}
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Generate the training data by headless self-play over a pool of processes.')
+    parser.add_argument('-n', '--games', type=int, default=1_000, help='the number of games')
+    parser.add_argument('-w', '--workers', type=int, default=multiprocessing.cpu_count(), help='the number of worker processes, one per CPU by default')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='the seed of the run')
+    parser.add_argument('-e', '--engine', choices=list(ENGINES), default='search', help='the engine of the dark side, and of both sides without an opponent')
+    parser.add_argument('--opponent', choices=list(ENGINES), help='the engine of the light side, the same engine by default')
+    parser.add_argument('-d', '--depth', type=int, default=3, help='the maximum search depth')
+    parser.add_argument('-t', '--time-limit', type=float, help='the time budget of a move in seconds')
+    parser.add_argument('--evaluator', choices=[Evaluator.MATERIAL, Evaluator.POSITIONAL], default=Evaluator.MATERIAL, help='the evaluator of the searches')
+    parser.add_argument('--simulations', type=int, default=800, help='the simulation budget of the Monte Carlo tree search')
+    parser.add_argument('--model', default=MODEL_PATH, help='the path of the AI model')
+    parser.add_argument('--book', default=BOOK_PATH, help='the opening book path')
+    parser.add_argument('--tablebases', default=TABLEBASE_DIR, help='the endgame tablebases directory')
+    parser.add_argument('--max-moves', type=int, default=1_000, help='the number of moves after which a game is saved unfinished')
+    parser.add_argument('-o', '--directory', default='.', help='the directory of the shards and the manifest')
+    parser.add_argument('--prefix', default='dark', help='the prefix of the shard names')
+    parser.add_argument('--max-rows', type=int, default=1_000_000, help='the number of rows after which a shard is rotated')
+    parser.add_argument('--deferred', action='store_true', help='leave the scores of the positions to scripts.scoring, or to --score-depth')
+    parser.add_argument('--score-depth', type=int, default=0, help='the depth of the search scoring the deferred positions at the end of each game')
+    parser.add_argument('--progress', type=int, default=100, help='the number of games between the progress lines, 0 for none')
+    args = parser.parse_args()
+
+    # Play the games
+    settings = {
+        'seed': args.seed,
+        'engine': args.engine,
+        'opponent': args.opponent,
+        'depth': args.depth,
+        'time_limit': args.time_limit,
+        'evaluator': args.evaluator,
+        'simulations': args.simulations,
+        'model_path': args.model,
+        'book_path': args.book,
+        'tablebase_dir': args.tablebases,
+        'max_moves': args.max_moves,
+        'directory': args.directory,
+        'prefix': args.prefix,
+        'max_rows': args.max_rows,
+        'deferred': args.deferred,
+        'score_depth': args.score_depth,
+    }
+    report = SelfPlay.run(args.games, args.workers, settings, args.progress)
+
+    # Print the summary
+    print(f'{report["games"]} games  {report["moves"]} moves  dark {report["dark_wins"]}  light {report["light_wins"]}  unfinished {report["unfinished"]}  {report["seconds"]:.1f}s  {report["games_per_second"]:.2f} games/s  {report["moves_per_second"]:.1f} moves/s')
@@ -0,0 +1,153 @@
+import atexit
+import csv
+import json
+import os
+import uuid
+from datetime import datetime
+
+MANIFEST = 'manifest.jsonl'
+
+class ShardWriter:
+    '''
+    The append-only writer of the game records, one CSV shard at a time.
+
+    Each shard has a name no other writer can take, so processes never share a file. A shard is written as
+    a .part file and renamed when it is rotated or closed, then listed in the manifest of the directory.
+    The manifest is appended one line per shard with a single write, so concurrent writers do not interleave.
+
+    Attributes:
+    - directory (str): The directory of the shards and the manifest.
+    - prefix (str): The prefix of the shard names.
+    - columns (list): The columns of the records.
+    - max_rows (int): The number of rows after which the shard is rotated, None for no row limit.
+    - max_bytes (int): The size after which the shard is rotated, None for no size limit.
+    - path (str): The path of the shard being written, None if there is none.
+    - file (file): The file of the shard being written, None if there is none.
+    - rows (int): The number of rows of the shard being written.
+
+    Methods:
+    - __init__(self, columns, directory, prefix, max_rows, max_bytes): Initialize the writer.
+    - write(self, rows): Append rows to the current shard.
+    - rotate(self): Finish the current shard.
+    - close(self): Finish the current shard and stop writing.
+    - publish(path, rows): List a finished shard in the manifest of its directory.
+    - read_manifest(directory): Get the finished shards listed in the manifest.
+    '''
+
+    def __init__(self, columns, directory='.', prefix='dark', max_rows=1_000_000, max_bytes=256 * 1_024 * 1_024):
+        '''
+        Initialize the writer.
+
+        Args:
+            columns (list): The columns of the records.
+            directory (str): The directory of the shards and the manifest.
+            prefix (str): The prefix of the shard names.
+            max_rows (int): The number of rows after which the shard is rotated, None for no row limit.
+            max_bytes (int): The size after which the shard is rotated, None for no size limit.
+
+        Returns:
+            ShardWriter: The writer.
+        '''
+        self.directory = directory
+        self.prefix = prefix
+        self.columns = columns
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.path = None
+        self.file = None
+        self.rows = 0
+
+    def write(self, rows):
+        '''
+        Append rows to the current shard, the rows of one call are never split across shards.
+
+        Args:
+            rows (list): The rows, each a sequence in the order of the columns.
+        '''
+        # Skip the empty writes
+        if not rows:
+            return
+
+        # Open a new shard with a name unique to the process and the shard
+        if not self.file:
+            os.makedirs(self.directory, exist_ok=True)
+            self.path = os.path.join(self.directory, f'{self.prefix}_{datetime.now():%Y%m%d%H%M%S}_{os.getpid()}_{uuid.uuid4().hex[:8]}.csv')
+            self.file = open(f'{self.path}.part', 'w', newline='')
+            csv.writer(self.file, lineterminator='\n').writerow(self.columns)
+
+            # Finish the shard if the process exits while it is being written
+            atexit.register(self.close)
+
+        # Append the rows
+        csv.writer(self.file, lineterminator='\n').writerows(rows)
+        self.file.flush()
+        self.rows += len(rows)
+
+        # Rotate the shard once it is full
+        if self.max_rows and self.rows >= self.max_rows or self.max_bytes and self.file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self):
+        '''
+        Finish the current shard, renaming it and listing it in the manifest.
+        '''
+        # Check if a shard is being written
+        if not self.file:
+            return
+
+        # Rename the shard atomically and list it in the manifest
+        self.file.close()
+        os.replace(f'{self.path}.part', self.path)
+        ShardWriter.publish(self.path, self.rows)
+
+        # Reset the shard, the finished shard no longer keeps the writer alive until the process exits
+        self.path, self.file, self.rows = None, None, 0
+        atexit.unregister(self.close)
+
+    def close(self):
+        '''
+        Finish the current shard and stop writing, the next write opens a new shard.
+        '''
+        self.rotate()
+
+    @staticmethod
+    def publish(path, rows):
+        '''
+        List a finished shard in the manifest of its directory with a single append.
+
+        Args:
+            path (str): The path of the shard.
+            rows (int): The number of rows of the shard.
+        '''
+        line = json.dumps({'path': os.path.basename(path), 'rows': rows, 'bytes': os.path.getsize(path), 'finished': datetime.now().isoformat(timespec='seconds')}) + '\n'
+        descriptor = os.open(os.path.join(os.path.dirname(path), MANIFEST), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, line.encode())
+        finally:
+            os.close(descriptor)
+
+    @staticmethod
+    def read_manifest(directory='.'):
+        '''
+        Get the finished shards listed in the manifest.
+
+        Args:
+            directory (str): The directory of the shards and the manifest.
+
+        Returns:
+            list: The path, the rows, the size and the finish time of each shard, in the order they were finished.
+        '''
+        # Check if the manifest exists
+        path = os.path.join(directory, MANIFEST)
+        if not os.path.isfile(path):
+            return []
+
+        # Read the shards that still exist, the latest entry of a shard listed again wins
+        with open(path) as file:
+            shards = {}
+            for line in file:
+                if line.strip():
+                    shard = json.loads(line)
+                    shard['path'] = os.path.join(directory, shard['path'])
+                    shards[shard['path']] = shard
+        return [shard for shard in shards.values() if os.path.isfile(shard['path'])]
@@ -0,0 +1,389 @@
+import argparse
+import itertools
+import os
+import numpy
+from concurrent.futures import *
+from scripts.bitboard import *
+
+TABLEBASE_DIR = 'tablebases'
+WIN_SCORE = 10_000
+
+# The largest signatures that can be generated, the moves of every position are linked one at a time in Python,
+# which takes about 20 seconds per table of 3 pieces and would take hours per table of 4 pieces
+MAX_PIECES = 3
+
+# The squares of the left half of the board including the middle file, and the mirror of each square
+HALF = (common.W + 1) // 2 * common.H
+MIRROR = tuple(SQUARE_OF[(common.W - 1 - position[0], position[1])] for position in POSITIONS)
+
+# The squares each piece code may stand on, only the rat and the dog swim
+REACHABLE = [frozenset(square for square in range(SQUARES) if not BITS[square] & RIVER or KIND_OF_CODE[code] in (PieceAtk.RAT, PieceAtk.DOG)) for code in range(CODES)]
+
+class Tablebase:
+    '''
+    The endgame tablebases.
+
+    One memory-mapped file per material signature, the sorted piece codes on the board, holding the result
+    of every position for the side to move: 0 for a draw, n > 0 if it wins and n < 0 if it loses in n - 1 moves.
+    Positions are mirrored so that the first piece stands on the left half of the board.
+    The forbidden move rule depends on the move history and is not part of the tables.
+
+    Attributes:
+    - directory (str): The directory of the tables.
+    - tables (dict): The memory-mapped table of each signature.
+    - max_pieces (int): The number of pieces of the largest signature.
+
+    Methods:
+    - __init__(self, directory): Open the tables.
+    - __len__(self): Get the number of tables.
+    - probe(self, board, side): Get the result of a position.
+    - probe_score(self, board, side, current_side): Get the score of a decided position.
+    - best_moves(self, board, side): Get the best moves of a position.
+    - score(value): Convert a result to a score.
+    - locate(board, side): Get the signature and the index of a position.
+    - signatures(pieces): Get the signatures with the given number of pieces.
+    - path(directory, signature): Get the path of the table of a signature.
+    - generate(directory, max_pieces, workers): Generate the missing tables.
+    - solve(directory, signature): Solve a signature by retrograde analysis.
+    '''
+
+    def __init__(self, directory=TABLEBASE_DIR):
+        '''
+        Open the tables.
+
+        Args:
+            directory (str): The directory of the tables.
+
+        Returns:
+            Tablebase: The tablebases, empty if the directory is missing.
+        '''
+        self.directory = directory
+        self.tables = {}
+        self.max_pieces = 0
+
+        # Map the complete tables
+        for file in os.path.isdir(directory) and sorted(os.listdir(directory)) or []:
+            if file.endswith('.tb'):
+                signature = tuple(int(code) for code in file[:-3].split('_'))
+                self.tables[signature] = numpy.memmap(os.path.join(directory, file), dtype=numpy.int16, mode='r')
+                self.max_pieces = max(self.max_pieces, len(signature))
+
+    def __len__(self):
+        '''
+        Get the number of tables.
+
+        Returns:
+            int: The number of tables.
+        '''
+        return len(self.tables)
+
+    def probe(self, board, side):
+        '''
+        Get the result of a position.
+
+        Args:
+            board (Board): The board.
+            side (PlayerSide): The side to move.
+
+        Returns:
+            int: The result for the side to move, None if the position is not in the tables.
+        '''
+        # Skip the positions with too many pieces
+        board = getattr(board, 'bitboard', board)
+        if bin(board.occupied[0] | board.occupied[1]).count('1') > self.max_pieces:
+            return None
+
+        # Look up the position
+        signature, index = Tablebase.locate(board, side)
+        table = self.tables.get(signature)
+        return None if table is None else int(table[index])
+
+    def probe_score(self, board, side, current_side):
+        '''
+        Get the score of a decided position.
+
+        Args:
+            board (Board): The board.
+            side (PlayerSide): The side to move.
+            current_side (PlayerSide): The side of the score.
+
+        Returns:
+            int: The score for the current side, None if the position is not in the tables or is a draw.
+        '''
+        value = self.probe(board, side)
+        return value and (Tablebase.score(value) if side == current_side else -Tablebase.score(value)) or None
+
+    def best_moves(self, board, side):
+        '''
+        Get the best moves of a position, the fastest win or the slowest loss.
+
+        Args:
+            board (Board): The board.
+            side (PlayerSide): The side to move.
+
+        Returns:
+            tuple: The score for the side to move and the best moves, None if the position is not in the tables.
+        '''
+        # Check that the position is in the tables
+        if self.probe(board, side) is None:
+            return None
+
+        # Score every valid move by the result of the opponent
+        opponent_side = PlayerSide.opponent_of(side)
+        scores = {}
+        for move in board.get_valid_moves(side):
+            board.make_move(move)
+            winner = board.winner
+            value = winner and (1 if winner == opponent_side else -1) or self.probe(board, opponent_side)
+            board.undo_move(move)
+            if value is None:
+                return None
+            scores[move] = -Tablebase.score(value)
+
+        # Return the best score and the moves that reach it
+        best_score = max(scores.values())
+        return best_score, [move for move, score in scores.items() if score == best_score]
+
+    @staticmethod
+    def score(value):
+        '''
+        Convert a result to a score, a faster win scores higher.
+
+        Args:
+            value (int): The result for the side to move.
+
+        Returns:
+            int: The score for the side to move.
+        '''
+        return 0 if not value else WIN_SCORE - value + 1 if value > 0 else -WIN_SCORE - value - 1
+
+    @staticmethod
+    def locate(board, side):
+        '''
+        Get the signature and the index of a position.
+
+        Args:
+            board (Bitboard): The bitboard.
+            side (PlayerSide): The side to move.
+
+        Returns:
+            tuple: The signature and the index of the position in its table.
+        '''
+        # Get the pieces sorted by code
+        pieces = []
+        occupied = board.occupied[0] | board.occupied[1]
+        while occupied:
+            low = occupied & -occupied
+            occupied ^= low
+            square = low.bit_length() - 1
+            pieces.append((board.mailbox[square], square))
+        pieces.sort()
+
+        # Mirror the position so that the first piece stands on the left half
+        squares = [square for _, square in pieces]
+        if squares[0] >= HALF:
+            squares = [MIRROR[square] for square in squares]
+
+        # Compute the index
+        index = SIDE_INDEX[side] * HALF + squares[0]
+        for square in squares[1:]:
+            index = index * SQUARES + square
+
+        # Return the signature and the index
+        return tuple(code for code, _ in pieces), index
+
+    @staticmethod
+    def signatures(pieces):
+        '''
+        Get the signatures with the given number of pieces, each side keeping at least one piece.
+
+        Args:
+            pieces (int): The number of pieces.
+
+        Returns:
+            list: The signatures.
+        '''
+        return [signature for signature in itertools.combinations(range(1, CODES), pieces) if SIDE_OF_CODE[signature[0]] == 0 and SIDE_OF_CODE[signature[-1]] == 1]
+
+    @staticmethod
+    def path(directory, signature):
+        '''
+        Get the path of the table of a signature.
+
+        Args:
+            directory (str): The directory of the tables.
+            signature (tuple): The signature.
+
+        Returns:
+            str: The path.
+        '''
+        return os.path.join(directory, '_'.join(str(code) for code in signature) + '.tb')
+
+    @staticmethod
+    def generate(directory=TABLEBASE_DIR, max_pieces=2, workers=None):
+        '''
+        Generate the missing tables, fewer pieces first since captures lead to them.
+
+        Args:
+            directory (str): The directory of the tables.
+            max_pieces (int): The number of pieces of the largest signatures.
+            workers (int): The number of worker processes, None for one per CPU, 1 to generate in this process.
+
+        Returns:
+            int: The number of tables generated.
+
+        Raises:
+            ValueError: If the signatures have more pieces than the generation supports.
+        '''
+        # Check the size of the signatures
+        if max_pieces > MAX_PIECES:
+            raise ValueError(f'the tables are limited to {MAX_PIECES} pieces')
+
+        # Create the directory
+        os.makedirs(directory, exist_ok=True)
+        result = 0
+
+        # Solve the missing signatures of each size, the finished tables are kept so the generation can resume
+        for pieces in range(2, max_pieces + 1):
+            missing = [signature for signature in Tablebase.signatures(pieces) if not os.path.isfile(Tablebase.path(directory, signature))]
+            if workers == 1:
+                for signature in missing:
+                    Tablebase.solve(directory, signature)
+            else:
+                with ProcessPoolExecutor(workers) as executor:
+                    list(executor.map(Tablebase.solve, [directory] * len(missing), missing))
+            result += len(missing)
+
+        # Return the number of tables generated
+        return result
+
+    @staticmethod
+    def solve(directory, signature):
+        '''
+        Solve a signature by retrograde analysis and write its table.
+
+        Every position is linked to the positions its moves lead to, then the results are resolved in the order of
+        their distance: the round k resolves the positions of distance k + 1 from the results of distance k,
+        a result of a smaller table or a finished game only counting from the round of its distance. A position is won
+        by its first move into a loss and lost by the last of its moves to turn into a win, so each distance is
+        the shortest win or the longest loss.
+
+        Args:
+            directory (str): The directory of the tables, holding the tables of the smaller signatures.
+            signature (tuple): The signature.
+
+        Raises:
+            ValueError: If the signature has more pieces than the generation supports.
+        '''
+        # Check the size of the signature
+        if len(signature) > MAX_PIECES:
+            raise ValueError(f'the tables are limited to {MAX_PIECES} pieces')
+
+        # Initialize the results, the moves of the same signature and the results of the smaller tables or finished games
+        size = 2 * HALF * SQUARES ** (len(signature) - 1)
+        values = numpy.zeros(size, dtype=numpy.int16)
+        resolved = numpy.zeros(size, dtype=bool)
+        remaining = numpy.zeros(size, dtype=numpy.int32)
+        parents, children = [], []
+        known_parents, known_values = [], []
+        smaller = Tablebase(directory)
+
+        # Link every position to the results of its moves
+        for index in range(size):
+            # Decode the side to move and the squares
+            rest, squares = index, []
+            for _ in signature[1:]:
+                rest, square = divmod(rest, SQUARES)
+                squares.insert(0, square)
+            side_index, first = divmod(rest, HALF)
+            squares.insert(0, first)
+
+            # Skip the impossible positions
+            if len(set(squares)) < len(squares) or any(square not in REACHABLE[code] for code, square in zip(signature, squares)):
+                continue
+
+            # Place the pieces
+            board = Bitboard()
+            for code, square in zip(signature, squares):
+                board.place(code, square)
+            side = SIDES[side_index]
+            opponent_side = PlayerSide.opponent_of(side)
+
+            # Score the finished games
+            if winner := board.get_winner():
+                values[index] = 1 if winner == side else -1
+                resolved[index] = True
+                continue
+
+            # Link the moves, each of them has to lead to a win of the opponent for the position to be lost
+            for move in board.get_valid_moves(side):
+                board.make_move(move)
+                remaining[index] += 1
+                if winner := board.get_winner():
+                    known_parents.append(index)
+                    known_values.append(1 if winner == opponent_side else -1)
+                else:
+                    child_signature, child_index = Tablebase.locate(board, opponent_side)
+                    if child_signature == signature:
+                        parents.append(index)
+                        children.append(child_index)
+                    else:
+                        known_parents.append(index)
+                        known_values.append(int(smaller.tables[child_signature][child_index]))
+                board.undo_move(move)
+
+        # Sort the moves by their child, and the known results by their distance, the draws never resolve a position
+        parents, children = numpy.array(parents, dtype=numpy.int64), numpy.array(children, dtype=numpy.int64)
+        order = numpy.argsort(children, kind='stable')
+        parents, children = parents[order], children[order]
+        known_parents, known_values = numpy.array(known_parents, dtype=numpy.int64), numpy.array(known_values, dtype=numpy.int64)
+        decided = known_values != 0
+        known_parents, known_values = known_parents[decided], known_values[decided]
+        order = numpy.argsort(numpy.abs(known_values), kind='stable')
+        known_parents, known_values = known_parents[order], known_values[order]
+        known_distances = numpy.abs(known_values)
+
+        # Resolve the positions one distance at a time, starting from the finished games
+        frontier = numpy.flatnonzero(resolved)
+        distance = 1
+        while len(frontier) or distance <= known_distances.max(initial=0):
+            # Gather the moves into the positions resolved at this distance and the known results of this distance
+            starts, ends = numpy.searchsorted(children, frontier, side='left'), numpy.searchsorted(children, frontier, side='right')
+            counts = ends - starts
+            edges = numpy.repeat(starts - numpy.cumsum(counts) + counts, counts) + numpy.arange(counts.sum())
+            begin, end = numpy.searchsorted(known_distances, [distance, distance + 1])
+            event_parents = numpy.concatenate((parents[edges], known_parents[begin:end]))
+            event_values = numpy.concatenate((values[children[edges]], known_values[begin:end]))
+
+            # Win in one more move the positions with a move into a loss
+            won = numpy.unique(event_parents[event_values < 0])
+            won = won[~resolved[won]]
+            values[won] = distance + 1
+            resolved[won] = True
+
+            # Lose in one more move the positions whose last move has just turned into a win
+            numpy.subtract.at(remaining, event_parents[event_values > 0], 1)
+            lost = numpy.unique(event_parents[event_values > 0])
+            lost = lost[~resolved[lost] & (remaining[lost] == 0)]
+            values[lost] = -distance - 1
+            resolved[lost] = True
+
+            # Move to the next distance
+            frontier = numpy.concatenate((won, lost))
+            distance += 1
+
+        # Write the table atomically
+        path = Tablebase.path(directory, signature)
+        values.tofile(f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+
+if __name__ == '__main__':
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description='Generate the endgame tablebases.')
+    parser.add_argument('-n', '--max-pieces', type=int, default=2, choices=range(2, MAX_PIECES + 1), help=f'the number of pieces of the largest signatures, at most {MAX_PIECES}')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='the number of worker processes, one per CPU by default')
+    parser.add_argument('-d', '--directory', default=TABLEBASE_DIR, help='the directory of the tables')
+    args = parser.parse_args()
+
+    # Generate the tables
+    print(f'{Tablebase.generate(args.directory, args.max_pieces, args.workers)} tables generated in {args.directory}')
@@ -0,0 +1,84 @@
+from scripts.common import *
+
+class TranspositionTable:
+    '''
+    The transposition table.
+
+    A fixed-size table indexed by the low bits of the Zobrist key. Scores are stored from the point of view
+    of the side to move, so the table can be shared between both sides and reused between moves.
+
+    Attributes:
+    - size (int): The number of entries, a power of two.
+    - mask (int): The mask that turns a key into an index.
+    - keys (list): The Zobrist key of each entry.
+    - depths (list): The search depth of each entry.
+    - bounds (list): The bound type of each entry.
+    - scores (list): The score of each entry.
+    - moves (list): The best move of each entry.
+
+    Methods:
+    - __init__(self, bits): Initialize the table.
+    - clear(self): Remove all the entries.
+    - probe(self, key): Get the entry of a position.
+    - store(self, key, depth, bound, score, move): Store the result of a search.
+    '''
+
+    def __init__(self, bits=18):
+        '''
+        Initialize the table.
+
+        Args:
+            bits (int): The number of index bits, the table holds 2 ** bits entries.
+
+        Returns:
+            TranspositionTable: The table.
+        '''
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.clear()
+
+    def clear(self):
+        '''
+        Remove all the entries.
+        '''
+        self.keys = [None] * self.size
+        self.depths = [-1] * self.size
+        self.bounds = [Bound.EXACT] * self.size
+        self.scores = [0] * self.size
+        self.moves = [None] * self.size
+
+    def probe(self, key):
+        '''
+        Get the entry of a position.
+
+        Args:
+            key (int): The Zobrist key.
+
+        Returns:
+            tuple: The depth, the bound, the score and the best move, or None if the position is not stored.
+        '''
+        index = key & self.mask
+        return (self.depths[index], self.bounds[index], self.scores[index], self.moves[index]) if self.keys[index] == key else None
+
+    def store(self, key, depth, bound, score, move):
+        '''
+        Store the result of a search, keeping the deeper entry when two positions share a slot.
+
+        Args:
+            key (int): The Zobrist key.
+            depth (int): The search depth.
+            bound (Bound): The bound type of the score.
+            score (int): The score from the point of view of the side to move.
+            move (tuple): The best move.
+        '''
+        # Get the slot and keep the deeper entry of another position
+        index = key & self.mask
+        if self.keys[index] != key and depth < self.depths[index]:
+            return
+
+        # Store the entry
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.scores[index] = score
+        self.moves[index] = move
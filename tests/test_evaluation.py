@@ -0,0 +1,156 @@
+import glob
+import itertools
+import random
+import numpy
+import pandas
+import pytest
+import scripts.bitboard as bitboard
+from scripts.board import *
+from scripts.evaluation import *
+from scripts.log import Log
+from scripts.manager import GameManager
+from scripts.records import GameRecords
+
+def encode_piece(piece_char):
+    '''
+    Encode the piece, as GameManager.encode_piece did before the shared encoder.
+
+    Args:
+        piece_char (str): The piece character.
+
+    Returns:
+        int: The piece encoding.
+    '''
+    piece_mapping = {'-': 0, 'r': 1, 'c': 2, 'd': 3, 'w': 4, 'p': 5, 't': 6, 'l': 7, 'e': 8, 'R': -1, 'C': -2, 'D': -3, 'W': -4, 'P': -5, 'T': -6, 'L': -7, 'E': -8}
+    return piece_mapping.get(piece_char, 0)
+
+def encode_board(board_str):
+    '''
+    Encode the board, as GameManager.encode_board and train.ipynb did before the shared encoder.
+
+    Args:
+        board_str (str): The board string.
+
+    Returns:
+        numpy.ndarray: The board matrix.
+    '''
+    board_matrix = numpy.zeros((9, 7))
+    for i, piece in enumerate(board_str[::-1]):
+        row, col = divmod(i, 9)
+        board_matrix[col][row] = encode_piece(piece)
+    return numpy.flip(numpy.flip(board_matrix, 0), 1)
+
+def reference(boards):
+    '''
+    Encode the boards one at a time with the reference encoder.
+
+    Args:
+        boards (list): The board strings.
+
+    Returns:
+        numpy.ndarray: The network input of shape (N, 9, 7, 1).
+    '''
+    return numpy.stack([encode_board(board) for board in boards])[..., numpy.newaxis]
+
+def random_boards(games=10, seed=0):
+    '''
+    Get the logged boards of seeded random games.
+
+    Args:
+        games (int): The number of games.
+        seed (int): The seed of the games.
+
+    Returns:
+        list: The board string after each move.
+    '''
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(games):
+        board, side = Board(is_copy=True), PlayerSide.LIGHT
+        for _ in range(200):
+            if board.is_game_over:
+                break
+            board.make_move(rng.choice(board.get_valid_moves(side)))
+            boards.append(Log.board_to_enum(board))
+            side = PlayerSide.opponent_of(side)
+    return boards
+
+def logged_boards(games=20):
+    '''
+    Get the boards of the first logged games, replayed on a board from their moves.
+
+    Args:
+        games (int): The number of games.
+
+    Returns:
+        list: The board string after each move, empty if the logs are not checked out.
+    '''
+    # Keep the logs that are checked out, not their LFS pointers
+    paths = []
+    for path in sorted(glob.glob('dark_*.csv')):
+        with open(path) as file:
+            if file.readline().startswith('id,'):
+                paths.append(path)
+
+    # Replay the games
+    boards = []
+    for _, _, moves, _ in itertools.islice(GameRecords.read_csv(paths), games):
+        board = Board(is_copy=True)
+        for packed in moves:
+            board.make_move(bitboard.MOVES[packed])
+            boards.append(Log.board_to_enum(board))
+    return boards
+
+@pytest.mark.parametrize('dtype', [numpy.float32, numpy.int8])
+def test_start_position(dtype):
+    boards = [Log.board_to_enum(Board(is_copy=True))]
+    encoded = Evaluation.encode_boards(boards, dtype)
+    assert encoded.dtype == dtype
+    assert numpy.array_equal(encoded, reference(boards))
+
+@pytest.mark.parametrize('dtype', [numpy.float32, numpy.int8])
+def test_empty_board(dtype):
+    boards = ['-' * bitboard.SQUARES]
+    assert numpy.array_equal(Evaluation.encode_boards(boards, dtype), numpy.zeros((1, 9, 7, 1)))
+    assert numpy.array_equal(reference(boards), numpy.zeros((1, 9, 7, 1)))
+
+@pytest.mark.parametrize('dtype', [numpy.float32, numpy.int8])
+def test_random_games(dtype):
+    boards = random_boards()
+    encoded = Evaluation.encode_boards(boards, dtype)
+    assert encoded.shape == (len(boards), 9, 7, 1)
+    assert encoded.dtype == dtype and encoded.flags['C_CONTIGUOUS']
+    assert numpy.array_equal(encoded, reference(boards))
+
+@pytest.mark.parametrize('dtype', [numpy.float32, numpy.int8])
+def test_logged_games(dtype):
+    if not (boards := logged_boards()):
+        pytest.skip('the dark_*.csv logs are not checked out')
+    assert numpy.array_equal(Evaluation.encode_boards(boards, dtype), reference(boards))
+
+@pytest.mark.parametrize('column', [list, pandas.Series, lambda boards: numpy.array(boards), lambda boards: numpy.array(boards, dtype=f'S{bitboard.SQUARES}')])
+def test_columns(column):
+    boards = random_boards(2)
+    assert numpy.array_equal(Evaluation.encode_boards(column(boards)), reference(boards))
+
+def test_wrong_length():
+    with pytest.raises(ValueError):
+        Evaluation.encode_boards(['-' * (bitboard.SQUARES - 1)])
+
+def test_manager_encode_board():
+    for board in random_boards(2):
+        assert numpy.array_equal(GameManager.encode_board(board), encode_board(board))
+
+def test_decode_boards():
+    # The codes of the logged boards are the mailboxes of the positions
+    rng = random.Random(0)
+    board, side = Board(is_copy=True), PlayerSide.LIGHT
+    boards, mailboxes = [], []
+    for _ in range(100):
+        if board.is_game_over:
+            break
+        board.make_move(rng.choice(board.get_valid_moves(side)))
+        boards.append(Log.board_to_enum(board))
+        mailboxes.append(bytes(board.bitboard.mailbox))
+        side = PlayerSide.opponent_of(side)
+    assert Evaluation.decode_boards(boards).tobytes() == b''.join(mailboxes)
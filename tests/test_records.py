@@ -0,0 +1,92 @@
+import csv
+import filecmp
+import os
+import random
+import pytest
+from scripts.board import *
+from scripts.log import COLUMNS, Log
+from scripts.records import GameRecords
+from scripts.shards import ShardWriter
+
+def write_log(directory, deferred=False, games=6, seed=0):
+    '''
+    Log seeded random games to a shard.
+
+    Args:
+        directory (str): The directory of the shard.
+        deferred (bool): True to log the moves without their scores, False otherwise.
+        games (int): The number of games.
+        seed (int): The seed of the games.
+
+    Returns:
+        str: The path of the shard.
+    '''
+    # Play and log the games
+    rng = random.Random(seed)
+    writer = ShardWriter(COLUMNS, str(directory))
+    log = Log(writer, deferred)
+    for _ in range(games):
+        board, side = Board(is_copy=True), PlayerSide.LIGHT
+        for _ in range(300):
+            if board.is_game_over:
+                break
+            move = rng.choice(board.get_valid_moves(side))
+            board.make_move(move)
+            log.insert_chess_record(board, move)
+            side = PlayerSide.opponent_of(side)
+        log.save()
+
+    # Return the finished shard
+    writer.close()
+    return ShardWriter.read_manifest(str(directory))[0]['path']
+
+def rewrite_score(path, score):
+    '''
+    Replace the score of the first row of a log.
+
+    Args:
+        path (str): The CSV path of the log.
+        score (str): The score.
+    '''
+    with open(path, newline='') as file:
+        rows = list(csv.reader(file))
+    rows[1][9] = score
+    with open(path, 'w', newline='') as file:
+        csv.writer(file, lineterminator='\n').writerows(rows)
+
+@pytest.mark.parametrize('deferred', [False, True])
+def test_round_trip(tmp_path, deferred):
+    path = write_log(tmp_path, deferred)
+    GameRecords.from_csv([path], str(tmp_path / 'games.bin'))
+    GameRecords.to_csv(str(tmp_path / 'games.bin'), str(tmp_path / 'games.csv'))
+    assert filecmp.cmp(path, tmp_path / 'games.csv', shallow=False)
+
+def test_deferred_scores_stay_empty(tmp_path):
+    path = write_log(tmp_path, True)
+    GameRecords.from_csv([path], str(tmp_path / 'games.bin'))
+    for game in GameRecords.read(str(tmp_path / 'games.bin')):
+        assert all(row[9] == '' for row in GameRecords.replay(game))
+
+def test_recomputed_scores(tmp_path):
+    scored = write_log(tmp_path / 'scored')
+    GameRecords.from_csv([write_log(tmp_path / 'deferred', True)], str(tmp_path / 'games.bin'), False)
+    GameRecords.to_csv(str(tmp_path / 'games.bin'), str(tmp_path / 'games.csv'))
+    with open(scored) as expected, open(tmp_path / 'games.csv') as actual:
+        assert [row.split(',', 1)[1] for row in expected] == [row.split(',', 1)[1] for row in actual]
+
+@pytest.mark.parametrize('score', ['0.5', '40000', '-32768'])
+def test_lossy_scores(tmp_path, score):
+    path = write_log(tmp_path)
+    rewrite_score(path, score)
+    with pytest.raises(ValueError):
+        GameRecords.from_csv([path], str(tmp_path / 'games.bin'))
+    assert not any(name.startswith('games.bin') for name in os.listdir(tmp_path))
+    GameRecords.from_csv([path], str(tmp_path / 'games.bin'), False)
+
+def test_row(tmp_path):
+    path = write_log(tmp_path, games=1)
+    GameRecords.from_csv([path], str(tmp_path / 'games.bin'))
+    game = next(GameRecords.read(str(tmp_path / 'games.bin')))
+    with open(path, newline='') as file:
+        rows = list(csv.reader(file))[1:]
+    assert [str(value) for value in GameRecords.row(game, 5)] == rows[5]
@@ -0,0 +1,63 @@
+import pytest
+import scripts.selfplay as selfplay
+from scripts.common import Evaluator
+from scripts.mcts import MCTS
+from scripts.selfplay import SelfPlay
+
+def settings(directory, engine):
+    '''
+    Get the settings of a small run.
+
+    Args:
+        directory (pathlib.Path): The directory of the shards.
+        engine (str): The engine of both sides.
+
+    Returns:
+        dict: The settings of the run.
+    '''
+    return {
+        'seed': 0,
+        'engine': engine,
+        'opponent': None,
+        'depth': 2,
+        'time_limit': None,
+        'evaluator': Evaluator.MATERIAL,
+        'simulations': 50,
+        'model_path': None,
+        'book_path': str(directory / 'missing.bin'),
+        'tablebase_dir': str(directory / 'missing'),
+        'max_moves': 12,
+        'directory': str(directory),
+        'prefix': 'dark',
+        'max_rows': 1_000_000,
+        'deferred': False,
+        'score_depth': 0,
+    }
+
+def moves_of(directory, indices, engine):
+    '''
+    Play games in a fresh worker and get the moves of the last one.
+
+    Args:
+        directory (pathlib.Path): The directory of the shards.
+        engine (str): The engine of both sides.
+        indices (list): The indices of the games, in the order they are played.
+        engine (str): The engine of both sides.
+
+    Returns:
+        list: The moves of the last game.
+    '''
+    directory.mkdir()
+    run = settings(directory, engine)
+    SelfPlay.initialize(run)
+
+    # Search the tree with the static evaluator rather than the AI model
+    selfplay._manager.mcts = MCTS()
+    for index in indices:
+        SelfPlay.play(index, run)
+    selfplay._manager.log.writer.close()
+    return selfplay._manager.board.move_history.copy()
+
+@pytest.mark.parametrize('engine', ['search', 'mcts'])
+def test_game_independent_of_worker(tmp_path, engine):
+    assert moves_of(tmp_path / 'alone', [3], engine) == moves_of(tmp_path / 'after', [0, 1, 2, 3], engine)
@@ -0,0 +1,79 @@
+import pytest
+from scripts.tablebase import *
+
+def positions(signature):
+    '''
+    Get the possible positions of a signature.
+
+    Args:
+        signature (tuple): The signature.
+
+    Yields:
+        tuple: The index, the bitboard and the side to move of each position.
+    '''
+    for index in range(2 * HALF * SQUARES ** (len(signature) - 1)):
+        # Decode the side to move and the squares
+        rest, squares = index, []
+        for _ in signature[1:]:
+            rest, square = divmod(rest, SQUARES)
+            squares.insert(0, square)
+        side_index, first = divmod(rest, HALF)
+        squares.insert(0, first)
+
+        # Place the pieces of the possible positions
+        if len(set(squares)) == len(squares) and all(square in REACHABLE[code] for code, square in zip(signature, squares)):
+            board = Bitboard()
+            for code, square in zip(signature, squares):
+                board.place(code, square)
+            yield index, board, SIDES[side_index]
+
+def expected(tablebase, board, side):
+    '''
+    Get the result of a position from the results of its moves.
+
+    Args:
+        tablebase (Tablebase): The tablebases.
+        board (Bitboard): The bitboard.
+        side (PlayerSide): The side to move.
+
+    Returns:
+        int: The shortest win, the longest loss or the draw.
+    '''
+    # Score the finished games
+    if winner := board.get_winner():
+        return 1 if winner == side else -1
+
+    # Get the result of the opponent after each move
+    opponent_side = PlayerSide.opponent_of(side)
+    children = []
+    for move in board.get_valid_moves(side):
+        board.make_move(move)
+        if winner := board.get_winner():
+            children.append(1 if winner == opponent_side else -1)
+        else:
+            children.append(tablebase.probe(board, opponent_side))
+        board.undo_move(move)
+
+    # Win through the fastest loss of the opponent, lose through its slowest win, draw otherwise
+    if losses := [-child for child in children if child < 0]:
+        return min(losses) + 1
+    return -max(children) - 1 if all(child > 0 for child in children) else 0
+
+@pytest.fixture(scope='module')
+def directory(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('tablebases'))
+    for signature in [(7, 16), (8, 16), (7, 8, 16), (1, 9)]:
+        Tablebase.solve(directory, signature)
+    return directory
+
+@pytest.mark.parametrize('signature', [(1, 9), (7, 8, 16)])
+def test_shortest_distances(directory, signature):
+    tablebase = Tablebase(directory)
+    table = tablebase.tables[signature]
+    assert all(int(table[index]) == expected(tablebase, board, side) for index, board, side in positions(signature))
+
+def test_piece_limit(tmp_path):
+    with pytest.raises(ValueError):
+        Tablebase.generate(str(tmp_path), MAX_PIECES + 1)
+    with pytest.raises(ValueError):
+        Tablebase.solve(str(tmp_path), tuple(range(1, MAX_PIECES + 1)) + (16,))